@@ -0,0 +1,76 @@
+"""
+Compares summarization backends against the fp32 torch baseline: load time,
+summarization latency, and agreement of the output with the baseline
+(unigram F1, a cheap stand-in for ROUGE-1).
+
+Usage: python benchmarks/bench_backends.py [text_file] [backends...]
+The model comes from EDU_HELPER_SUMMARY_MODEL. The first int8/onnx run
+also converts the model and saves it under data/models.
+"""
+
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.models import DEFAULT_SUMMARY_MODEL, SUMMARY_BACKENDS, model_registry, summary_model_id
+from core.summarizer import summarize_text
+
+SAMPLE = (
+    "Photosynthesis is the process by which green plants use sunlight to make glucose. "
+    "It takes place in the chloroplasts and releases oxygen as a by-product. "
+    "The light reactions capture energy, while the Calvin cycle fixes carbon dioxide. "
+    "Cellular respiration later breaks glucose down to release that stored energy. "
+)
+
+def unigram_f1(candidate: str, reference: str) -> float:
+    """Word-overlap F1 between two summaries."""
+    cand = Counter(candidate.lower().split())
+    ref = Counter(reference.lower().split())
+    overlap = sum((cand & ref).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(cand.values())
+    recall = overlap / sum(ref.values())
+    return 2 * precision * recall / (precision + recall)
+
+def main():
+    args = sys.argv[1:]
+    if args and args[0] not in SUMMARY_BACKENDS:
+        text = Path(args.pop(0)).read_text(encoding="utf-8")
+    else:
+        text = SAMPLE * 20
+    backends = args or list(SUMMARY_BACKENDS)
+    if "torch" not in backends:
+        backends.insert(0, "torch")
+
+    print(f"Model: {DEFAULT_SUMMARY_MODEL}")
+    baseline = None
+    baseline_seconds = None
+    for backend in backends:
+        model_id = summary_model_id(backend=backend)
+        start = time.perf_counter()
+        try:
+            model_registry.warmup("summarization", model_id)
+        except Exception as e:
+            print(f"{backend:<6} unavailable: {str(e)}")
+            continue
+        load_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        summary = summarize_text(text, model_id=model_id, use_cache=False)
+        seconds = time.perf_counter() - start
+        model_registry.evict("summarization", model_id)
+
+        if baseline is None:
+            baseline, baseline_seconds = summary, seconds
+        print(
+            f"{backend:<6} load {load_seconds:7.2f} s  summarize {seconds:7.2f} s  "
+            f"speedup {baseline_seconds / seconds:5.2f}x  F1 vs fp32 {unigram_f1(summary, baseline):.3f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Throughput benchmark for StudyMaterialParser.clean_extracted_text against
+the original eight-pass regex cleaner.
+
+Usage: python benchmarks/bench_parser.py [megabytes]
+"""
+
+import random
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.parser import StudyMaterialParser
+
+def legacy_clean(text):
+    """The original eight-pass cleaner."""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s.,!?;:\'"()-]', '', text)
+    text = re.sub(r'[.]{3,}', '...', text)
+    text = re.sub(r'[!]{2,}', '!', text)
+    text = re.sub(r'[?]{2,}', '?', text)
+    text = re.sub(r'\s+([,.!?;:])', r'\1', text)
+    text = re.sub(r'([,.!?;:])\s*([,.!?;:])', r'\1 \2', text)
+    return text.strip()
+
+def make_corpus(megabytes: float, ascii_only: bool = False, seed: int = 0) -> str:
+    """Build PDF-extraction-like text: words, punctuation, line breaks and stray symbols."""
+    rng = random.Random(seed)
+    symbols = ["*", "#", "@"] if ascii_only else ["•", "→", "—"]
+    words = ["photosynthesis", "the", "cell", "energy", "is", "of", "mitochondria",
+             "Chapter", "3.2", "(see", "Fig.", "4)", "reaction", "an"] + symbols
+    tails = [" ", ", ", ". ", "\n", ".\n\n", " ... ", "?! ", "  ", " ,"]
+    weights = [80, 6, 5, 6, 1, 0.5, 0.5, 1, 0.5]
+    parts = []
+    size = 0
+    target = int(megabytes * 1024 * 1024)
+    while size < target:
+        part = rng.choice(words) + rng.choices(tails, weights)[0]
+        parts.append(part)
+        size += len(part)
+    return "".join(parts)
+
+def bench(name: str, fn, text: str, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    mb = len(text) / (1024 * 1024)
+    print(f"{name:<24} {best * 1000:9.1f} ms  {mb / best:8.1f} MB/s")
+    return best
+
+def main():
+    megabytes = float(sys.argv[1]) if len(sys.argv) > 1 else 20
+    parser = StudyMaterialParser()
+
+    for ascii_only in (True, False):
+        text = make_corpus(megabytes, ascii_only=ascii_only)
+        assert parser.clean_extracted_text(text) == legacy_clean(text)
+
+        kind = "ASCII" if ascii_only else "mixed Unicode"
+        print(f"Cleaning {len(text) / (1024 * 1024):.1f} MB of {kind} text")
+        legacy = bench("legacy (8 passes)", legacy_clean, text)
+        current = bench("clean_extracted_text", parser.clean_extracted_text, text)
+        chunks = [text[i : i + 64 * 1024] for i in range(0, len(text), 64 * 1024)]
+        bench("clean_stream (64 KB)", lambda _: "".join(parser.clean_stream(chunks)), text)
+        print(f"speedup: {legacy / current:.2f}x\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Measures summarizer throughput (chunks per second) for several batch sizes,
+to pick EDU_HELPER_SUMMARY_BATCH_SIZE for a node.
+
+Usage: python benchmarks/bench_summarizer.py [text_file] [batch sizes...]
+The model comes from EDU_HELPER_SUMMARY_MODEL; a small checkpoint such as
+sshleifer/distilbart-cnn-6-6 keeps the run short.
+"""
+
+import sys
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.models import model_registry
+from core.summarizer import summarize_text
+
+SAMPLE = (
+    "Photosynthesis is the process by which green plants use sunlight to make glucose. "
+    "It takes place in the chloroplasts and releases oxygen as a by-product. "
+    "The light reactions capture energy, while the Calvin cycle fixes carbon dioxide. "
+)
+
+def main():
+    args = sys.argv[1:]
+    if args and not args[0].isdigit():
+        text = Path(args.pop(0)).read_text(encoding="utf-8")
+    else:
+        text = SAMPLE * 200
+    batch_sizes = [int(a) for a in args] or [1, 2, 4, 8]
+
+    try:
+        model_registry.warmup("summarization")
+    except Exception as e:
+        print(f"Summarization model unavailable: {str(e)}")
+        return
+
+    print(f"Model: {model_registry.default_model('summarization')}")
+    for batch_size in batch_sizes:
+        stats = {}
+        # Bypass the summary caches so every run measures inference
+        summarize_text(text, batch_size=batch_size, stats=stats, use_cache=False)
+        print(
+            f"batch_size={batch_size:<3} chunks={stats['chunks']:<5} "
+            f"batches={stats['batches']:<5} {stats['seconds']:8.2f} s  "
+            f"{stats['chunks_per_second']:6.2f} chunks/s"
+        )
+
+if __name__ == "__main__":
+    main()
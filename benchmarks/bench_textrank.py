@@ -0,0 +1,53 @@
+"""
+Compares the TextRank extractive summarizer with the original position &
+length heuristic on synthetic documents of growing size.
+
+Usage: python benchmarks/bench_textrank.py [sentence counts...]
+"""
+
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.summarizer import _position_summary
+from core.textrank import top_sentence_indexes
+
+TOPICS = [
+    "photosynthesis chlorophyll light glucose oxygen chloroplast",
+    "mitochondria respiration energy glucose enzyme membrane",
+    "volcano magma eruption tectonic plate crust",
+    "revolution parliament monarchy treaty empire colony",
+]
+
+def make_sentences(count: int, seed: int = 0):
+    """Sentences mixing a few topic words into common filler words."""
+    rng = random.Random(seed)
+    filler = [f"term{i}" for i in range(5000)]
+    topics = [t.split() for t in TOPICS]
+    sentences = []
+    for _ in range(count):
+        words = rng.choices(rng.choice(topics), k=4) + rng.choices(filler, k=12)
+        rng.shuffle(words)
+        sentences.append("The " + " ".join(words) + ".")
+    return sentences
+
+def bench(name: str, fn, sentences) -> float:
+    start = time.perf_counter()
+    fn(sentences)
+    elapsed = time.perf_counter() - start
+    print(f"{name:<12} {len(sentences):>8} sentences {elapsed * 1000:10.1f} ms")
+    return elapsed
+
+def main():
+    counts = [int(a) for a in sys.argv[1:]] or [1_000, 10_000, 100_000]
+    for count in counts:
+        sentences = make_sentences(count)
+        bench("heuristic", _position_summary, sentences)
+        bench("textrank", top_sentence_indexes, sentences)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import zlib
+from typing import Callable, Dict, List, Optional, Union
+from .document import Document, as_document
+
+# Bump whenever chunk boundaries change so cached per-chunk results are not reused
+CHUNKER_VERSION = "2"
+
+# Share of the budget a stable chunk fills before it may end at a content-defined boundary
+STABLE_MIN_FILL = 0.6
+
+# Input budget used when the tokenizer doesn't report one (BART's limit)
+DEFAULT_MAX_TOKENS = 1024
+
+# Rough tokens per whitespace-separated word for subword tokenizers
+_TOKENS_PER_WORD = 1.3
+
+def approx_token_count(text: str) -> int:
+    """Estimate the token count of text without a tokenizer."""
+    return int(len(text.split()) * _TOKENS_PER_WORD) + 1
+
+def model_max_tokens(tokenizer, default: int = DEFAULT_MAX_TOKENS) -> int:
+    """Return the tokenizer's max input length, ignoring 'unlimited' sentinels."""
+    limit = getattr(tokenizer, "model_max_length", None)
+    if not limit or limit > 100_000:
+        return default
+    return int(limit)
+
+def _token_counter(tokenizer) -> Callable[[List[str]], List[int]]:
+    """Return a function counting tokens for a batch of texts."""
+    if tokenizer is None:
+        return lambda texts: [approx_token_count(t) for t in texts]
+
+    def count(texts: List[str]) -> List[int]:
+        if not texts:
+            return []
+        # One batched call is far cheaper than tokenizing sentence by sentence
+        encoded = tokenizer(texts, add_special_tokens=False)["input_ids"]
+        return [len(ids) for ids in encoded]
+    return count
+
+def chunk_document(
+    text: Union[str, Document],
+    max_tokens: Optional[int] = None,
+    tokenizer=None,
+    overlap_sentences: int = 0,
+    stats: Optional[Dict] = None,
+    stable: bool = False
+) -> List[str]:
+    """
+    Pack whole sentences into chunks of at most `max_tokens` tokens (default:
+    the tokenizer's limit), counted with `tokenizer` or estimated. Chunks may
+    repeat `overlap_sentences` of the previous one. With `stable`, chunks
+    also end at content-defined boundaries, so edits only change nearby chunks.
+    """
+    document = as_document(text)
+    if max_tokens is None:
+        max_tokens = model_max_tokens(tokenizer)
+        if tokenizer is not None:
+            max_tokens -= tokenizer.num_special_tokens_to_add()
+    max_tokens = max(1, max_tokens)
+
+    count = _token_counter(tokenizer)
+    sentences = document.sentences()
+    pieces = []
+    for sentence, tokens in zip(sentences, count(sentences)):
+        if tokens <= max_tokens:
+            pieces.append((sentence, tokens))
+        else:
+            pieces.extend(_split_long_sentence(sentence, tokens, max_tokens, count))
+
+    min_tokens = int(max_tokens * STABLE_MIN_FILL)
+    # Boundaries fall on average every half of the remaining budget
+    spacing = max(1.0, (max_tokens - min_tokens) / 2)
+    chunks = []
+    chunk_tokens = []
+    current = []
+    current_tokens = 0
+    boundary = False
+    for piece, tokens in pieces:
+        if current and (boundary or current_tokens + tokens > max_tokens):
+            chunks.append(" ".join(p for p, _ in current))
+            chunk_tokens.append(current_tokens)
+            # Carry trailing sentences forward as overlap if they leave room
+            carried = current[-overlap_sentences:] if overlap_sentences > 0 else []
+            while carried and sum(t for _, t in carried) + tokens > max_tokens:
+                carried = carried[1:]
+            current = list(carried)
+            current_tokens = sum(t for _, t in current)
+        current.append((piece, tokens))
+        current_tokens += tokens
+        boundary = stable and current_tokens >= min_tokens and _is_boundary(piece, tokens, spacing)
+    if current:
+        chunks.append(" ".join(p for p, _ in current))
+        chunk_tokens.append(current_tokens)
+
+    if stats is not None:
+        total = sum(chunk_tokens)
+        stats.update({
+            "chunks": len(chunks),
+            "sentences": len(sentences),
+            "max_tokens": max_tokens,
+            "tokens": total,
+            "mean_tokens_per_chunk": total / len(chunks) if chunks else 0.0,
+            "fill_ratio": total / (len(chunks) * max_tokens) if chunks else 0.0
+        })
+    return chunks
+
+def _is_boundary(piece: str, tokens: int, spacing: float) -> bool:
+    """Whether a chunk may end after this piece; on average one boundary per `spacing` tokens."""
+    # CRC-32 rather than hash(), which differs between processes
+    return zlib.crc32(piece.encode("utf-8")) / 2**32 < tokens / spacing
+
+def _split_long_sentence(sentence: str, tokens: int, max_tokens: int, count) -> List[tuple]:
+    """Split an over-budget sentence into word windows that fit the budget."""
+    words = sentence.split()
+    window = max(1, int(len(words) * max_tokens / tokens))
+    while True:
+        parts = [" ".join(words[i : i + window]) for i in range(0, len(words), window)]
+        counts = count(parts)
+        if window == 1 or max(counts) <= max_tokens:
+            return list(zip(parts, counts))
+        window = max(1, int(window * 0.8))
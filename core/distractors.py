@@ -0,0 +1,161 @@
+import math
+import re
+from bisect import bisect_left
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Union
+from .document import Document, as_document
+from .terms import STOPWORDS
+
+# Candidate terms: words of three or more characters, case preserved
+_TERM_RE = re.compile(r"[^\W_]{3,}")
+
+# Word endings that hint at a part of speech, checked in order
+_SUFFIX_CLASSES = (
+    ("noun", ("tion", "sion", "ment", "ness", "ity", "ism", "ance", "ence", "ship", "ogy")),
+    ("gerund", ("ing",)),
+    ("past", ("ed",)),
+    ("adverb", ("ly",)),
+    ("adjective", ("ous", "ive", "able", "ible", "al", "ful", "less", "ic", "ary")),
+)
+
+# Leading characters two terms may share before they count as the same word
+_STEM_LENGTH = 5
+
+def term_shape(term: str) -> str:
+    """
+    Coarse part-of-speech-like class of a term from its case and ending,
+    e.g. "title:noun" for "Respiration" or "lower:plural" for "cells".
+    """
+    if term.isdigit():
+        return "number"
+    if any(ch.isdigit() for ch in term):
+        return "alnum"
+    if term.isupper():
+        case = "upper"
+    elif term[0].isupper():
+        case = "title"
+    else:
+        case = "lower"
+    lower = term.lower()
+    for name, endings in _SUFFIX_CLASSES:
+        if lower.endswith(endings):
+            return f"{case}:{name}"
+    if lower.endswith("s") and not lower.endswith("ss"):
+        return f"{case}:plural"
+    return f"{case}:word"
+
+class VocabularyIndex:
+    """
+    Per-document index of candidate distractor terms.
+
+    Terms are grouped by shape (see term_shape), and within a group sorted
+    by frequency band and length, so the terms most like an answer are
+    found by one bisect and a short walk outward. When an `encode` function
+    is given (e.g. SentenceTransformer.encode), term vectors are computed
+    once and distractors are the answer's nearest neighbours instead.
+    """
+    def __init__(self, text: Union[str, Document], encode: Optional[Callable] = None):
+        document = as_document(text)
+        counts = Counter(_TERM_RE.findall(document.text))
+        self.frequencies: Dict[str, int] = {
+            term: count for term, count in counts.items() if term.lower() not in STOPWORDS
+        }
+
+        groups: Dict[str, List] = {}
+        for term, count in self.frequencies.items():
+            key = self._sort_key(term, count)
+            shape = term_shape(term)
+            # Narrow group first, then broader ones to fall back on
+            for group in (shape, shape.split(":")[0], "*"):
+                groups.setdefault(group, []).append((key, term))
+
+        self._keys: Dict[str, List[int]] = {}
+        self._terms: Dict[str, List[str]] = {}
+        for group, entries in groups.items():
+            entries.sort()
+            self._keys[group] = [key for key, _ in entries]
+            self._terms[group] = [term for _, term in entries]
+
+        self._vectors = None
+        self._vector_terms = []
+        if encode is not None and self.frequencies:
+            self._build_vectors(encode)
+
+    def __len__(self) -> int:
+        return len(self.frequencies)
+
+    @staticmethod
+    def _sort_key(term: str, count: int) -> int:
+        """Frequency band (log2 of the count), then length."""
+        return (int(math.log2(count)) << 8) | min(len(term), 255)
+
+    def _build_vectors(self, encode: Callable):
+        import numpy as np
+        self._vector_terms = list(self.frequencies)
+        vectors = np.asarray(encode(self._vector_terms), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        self._vectors = vectors / norms
+        self._vector_rows = {term: row for row, term in enumerate(self._vector_terms)}
+
+    def distractors(self, answer: str, k: int = 3, rng=None) -> List[str]:
+        """
+        Return up to k terms resembling `answer` but distinct from it. With
+        `rng` (a random.Random), picks k at random from the closest few
+        candidates; otherwise returns the closest ones.
+        """
+        if self._vectors is not None and answer in self._vector_rows:
+            candidates = self._nearest_neighbours(answer, k * 3)
+        else:
+            candidates = self._nearest_by_shape(answer, k * 3)
+        if rng is not None and len(candidates) > k:
+            return rng.sample(candidates, k)
+        return candidates[:k]
+
+    def _nearest_by_shape(self, answer: str, limit: int) -> List[str]:
+        """Walk outward from the answer's position in its shape group, then broader groups."""
+        shape = term_shape(answer)
+        key = self._sort_key(answer, self.frequencies.get(answer, 1))
+        chosen = []
+        seen = {answer.lower()[:_STEM_LENGTH]}
+        for group in (shape, shape.split(":")[0], "*"):
+            keys = self._keys.get(group)
+            if not keys:
+                continue
+            terms = self._terms[group]
+            right = bisect_left(keys, key)
+            left = right - 1
+            while len(chosen) < limit and (left >= 0 or right < len(keys)):
+                # Step towards whichever neighbour is closer in band and length
+                if right >= len(keys) or (left >= 0 and key - keys[left] <= keys[right] - key):
+                    term = terms[left]
+                    left -= 1
+                else:
+                    term = terms[right]
+                    right += 1
+                stem = term.lower()[:_STEM_LENGTH]
+                if stem not in seen:
+                    seen.add(stem)
+                    chosen.append(term)
+            if len(chosen) >= limit:
+                break
+        return chosen
+
+    def _nearest_neighbours(self, answer: str, limit: int) -> List[str]:
+        """Terms whose vectors are most similar to the answer's."""
+        import numpy as np
+        similarity = self._vectors @ self._vectors[self._vector_rows[answer]]
+        count = min(len(similarity), limit * 2 + 1)
+        best = np.argpartition(-similarity, count - 1)[:count]
+        best = best[np.argsort(-similarity[best])]
+        chosen = []
+        seen = {answer.lower()[:_STEM_LENGTH]}
+        for row in best.tolist():
+            term = self._vector_terms[row]
+            stem = term.lower()[:_STEM_LENGTH]
+            if stem not in seen:
+                seen.add(stem)
+                chosen.append(term)
+                if len(chosen) == limit:
+                    break
+        return chosen
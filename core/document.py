@@ -0,0 +1,134 @@
+import hashlib
+import re
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Iterator, List, Tuple, Union
+
+# Number of segmented documents kept per process, keyed by content hash
+DOCUMENT_CACHE_SIZE = 8
+
+# Paragraphs are separated by one or more blank lines
+_PARAGRAPH_BREAK_RE = re.compile(r'\n[^\S\n]*\n\s*')
+
+# A sentence runs from its first non-space character to terminal punctuation
+# followed by whitespace, or to the end of its paragraph
+_SENTENCE_RE = re.compile(r'\S.*?(?:[.!?]+(?=\s)|$)', re.DOTALL)
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+class Document:
+    """
+    Text segmented once into paragraphs and sentences.
+
+    Boundaries are stored as character offsets in compact arrays, so the
+    summarizer, flashcard generator and search index all share one
+    segmentation and agree on where sentences start and end. Sentences never
+    cross a paragraph break.
+    """
+    def __init__(self, text: str, content_hash: str = None):
+        self.text = text or ""
+        self.content_hash = content_hash or _hash_text(self.text)
+        self.sentence_starts = array('I')
+        self.sentence_ends = array('I')
+        self.sentence_paragraphs = array('I')
+        self.paragraph_starts = array('I')
+        self.paragraph_ends = array('I')
+        self._segment()
+
+    def _segment(self):
+        """Fill the offset arrays in one scan over the text."""
+        text = self.text
+        start = 0
+        for brk in _PARAGRAPH_BREAK_RE.finditer(text):
+            self._add_paragraph(start, brk.start())
+            start = brk.end()
+        self._add_paragraph(start, len(text))
+
+    def _add_paragraph(self, start: int, end: int):
+        text = self.text
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start == end:
+            return
+
+        paragraph = len(self.paragraph_starts)
+        self.paragraph_starts.append(start)
+        self.paragraph_ends.append(end)
+        for match in _SENTENCE_RE.finditer(text, start, end):
+            self.sentence_starts.append(match.start())
+            self.sentence_ends.append(match.end())
+            self.sentence_paragraphs.append(paragraph)
+
+    def __len__(self) -> int:
+        return len(self.sentence_starts)
+
+    @property
+    def num_sentences(self) -> int:
+        return len(self.sentence_starts)
+
+    @property
+    def num_paragraphs(self) -> int:
+        return len(self.paragraph_starts)
+
+    def sentence(self, index: int) -> str:
+        """Return the text of one sentence."""
+        return self.text[self.sentence_starts[index] : self.sentence_ends[index]]
+
+    def sentence_span(self, index: int) -> Tuple[int, int]:
+        """Return the (start, end) character offsets of one sentence."""
+        return self.sentence_starts[index], self.sentence_ends[index]
+
+    def sentences(self, min_length: int = 0) -> List[str]:
+        """Return all sentences at least `min_length` characters long."""
+        return [sentence for _, sentence in self.iter_sentences(min_length)]
+
+    def iter_sentences(self, min_length: int = 0) -> Iterator[Tuple[int, str]]:
+        """Yield (index, sentence) for sentences at least `min_length` characters long."""
+        text = self.text
+        for index, (start, end) in enumerate(zip(self.sentence_starts, self.sentence_ends)):
+            if end - start >= min_length:
+                yield index, text[start:end]
+
+    def paragraph(self, index: int) -> str:
+        """Return the text of one paragraph."""
+        return self.text[self.paragraph_starts[index] : self.paragraph_ends[index]]
+
+    def paragraphs(self) -> List[str]:
+        """Return all paragraphs."""
+        return [self.paragraph(i) for i in range(self.num_paragraphs)]
+
+    def paragraph_of(self, sentence_index: int) -> int:
+        """Return the index of the paragraph containing a sentence."""
+        return self.sentence_paragraphs[sentence_index]
+
+def _hash_text(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+def get_document(text: str) -> Document:
+    """
+    Return the segmented Document for text, reusing a cached one when the
+    same content was segmented recently.
+    """
+    content_hash = _hash_text(text or "")
+    with _cache_lock:
+        document = _cache.get(content_hash)
+        if document is not None:
+            _cache.move_to_end(content_hash)
+            return document
+
+    document = Document(text, content_hash=content_hash)
+    with _cache_lock:
+        _cache[content_hash] = document
+        while len(_cache) > DOCUMENT_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return document
+
+def as_document(text: Union[str, Document]) -> Document:
+    """Accept either raw text or an existing Document."""
+    if isinstance(text, Document):
+        return text
+    return get_document(text)
@@ -1,15 +1,426 @@
+import codecs
 import io
+import mmap
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+import PyPDF2
 from PyPDF2 import PdfReader
+from services.cache import CacheService, content_key
+from .parallel import mp_context
 
-def extract_text_from_pdf(file_buffer: io.BytesIO) -> str:
+# Bump whenever extraction output changes so cached text is not reused
+EXTRACTOR_VERSION = "1"
+
+# Maximum number of extracted pages held ahead of a slow consumer
+PAGE_BUFFER_SIZE = 4
+
+# Documents with fewer pages than this are extracted serially, since
+# starting a process pool costs more than it saves on short files
+PARALLEL_MIN_PAGES = 32
+
+# Shards handed out per worker; more, smaller shards balance uneven pages
+SHARDS_PER_WORKER = 4
+
+# Bytes decoded per step when streaming text files
+TXT_BLOCK_SIZE = 64 * 1024
+
+# Bytes sampled from the start of a text file to detect its encoding
+ENCODING_SAMPLE_SIZE = 64 * 1024
+
+# Byte-order marks, longest first since the UTF-32 LE mark starts with UTF-16 LE's
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+# Block size used when spilling a non-buffer stream to a temporary file
+SPILL_CHUNK_SIZE = 1024 * 1024
+
+# Anything the fetcher functions accept as a document
+BufferSource = Union[bytes, bytearray, memoryview, mmap.mmap, BinaryIO]
+
+# Per-process reader used by parallel extraction workers
+_worker_reader = None
+
+# Lazily created process-wide extraction cache
+_extraction_cache = None
+
+_END = object()
+
+class BufferReader(io.RawIOBase):
+    """Read-only, seekable file object over a memoryview, without copying it."""
+    def __init__(self, buffer: memoryview):
+        self._view = buffer
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        n = max(0, min(len(b), len(self._view) - self._pos))
+        b[:n] = self._view[self._pos : self._pos + n]
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError("Negative seek position")
+        self._pos = pos
+        return pos
+
+    def tell(self) -> int:
+        return self._pos
+
+def as_buffer(source: BufferSource) -> memoryview:
     """
-    Extracts text from every page of a PDF file buffer.
-    Returns a single string with newline-separated page texts.
+    Return a memoryview over an upload without copying it where possible.
+
+    Bytes-like objects and mmaps are viewed directly, and BytesIO-style objects
+    (including Streamlit's UploadedFile) expose their buffer via getbuffer().
+    Other streams are spilled to a memory-mapped temporary file.
+    """
+    if isinstance(source, memoryview):
+        return source
+    if isinstance(source, (bytes, bytearray, mmap.mmap)):
+        return memoryview(source)
+    if hasattr(source, "getbuffer"):
+        return source.getbuffer()
+    return spill_to_mmap(source)
+
+def spill_to_mmap(stream: BinaryIO, chunk_size: int = SPILL_CHUNK_SIZE) -> memoryview:
+    """Copy a stream to an anonymous temporary file in blocks and memory-map it."""
+    if hasattr(stream, "seek"):
+        stream.seek(0)
+    with tempfile.TemporaryFile() as spill:
+        shutil.copyfileobj(stream, spill, chunk_size)
+        spill.flush()
+        if spill.tell() == 0:
+            return memoryview(b"")
+        # The mapping keeps its own handle, so the file can be closed here
+        return memoryview(mmap.mmap(spill.fileno(), 0, access=mmap.ACCESS_READ))
+
+def _open_stream(source: BufferSource) -> BinaryIO:
+    """Return a seekable binary stream over source for PdfReader."""
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)) or hasattr(source, "getbuffer"):
+        return BufferReader(as_buffer(source))
+    # Real file handles are already seekable streams
+    return source
+
+class _ExtractionError:
+    """Carries an exception from the extraction thread to the consumer."""
+    def __init__(self, error: Exception):
+        self.error = error
+
+def iter_pdf_pages(file_buffer: BufferSource, buffer_size: int = PAGE_BUFFER_SIZE) -> Iterator[Tuple[int, str]]:
     """
-    reader = PdfReader(file_buffer)
-    text_pages = []
-    for page in reader.pages:
+    Lazily extracts a PDF, yielding (page_number, text) as each page is done.
+
+    Page numbers are 1-based and pages without extractable text are skipped.
+    Extraction runs ahead of the consumer on a background thread by at most
+    `buffer_size` pages, so memory stays bounded however long the document is.
+    A `buffer_size` of 0 extracts inline on the caller's thread instead.
+
+    `file_buffer` may be a file object, bytes, a memoryview or an mmap.
+    """
+    reader = PdfReader(_open_stream(file_buffer))
+    if buffer_size <= 0:
+        yield from _iter_reader_pages(reader)
+        return
+
+    pages = queue.Queue(maxsize=buffer_size)
+    stop = threading.Event()
+
+    def offer(item) -> bool:
+        # Block while the buffer is full, but give up once the consumer leaves
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in _iter_reader_pages(reader):
+                if not offer(item):
+                    return
+        except Exception as e:
+            offer(_ExtractionError(e))
+            return
+        offer(_END)
+
+    worker = threading.Thread(target=produce, name="pdf-page-extractor", daemon=True)
+    worker.start()
+    try:
+        while True:
+            item = pages.get()
+            if item is _END:
+                break
+            if isinstance(item, _ExtractionError):
+                raise item.error
+            yield item
+    finally:
+        stop.set()
+        worker.join()
+
+def _iter_reader_pages(reader: PdfReader) -> Iterator[Tuple[int, str]]:
+    """Yield (page_number, text) for every page of an open reader that has text."""
+    for page_number, page in enumerate(reader.pages, start=1):
         page_text = page.extract_text()
         if page_text:
-            text_pages.append(page_text)
-    return "\n".join(text_pages)
+            yield page_number, page_text
+
+def iter_pdf_pages_parallel(
+    file_buffer: BufferSource,
+    max_workers: Optional[int] = None,
+    min_pages: int = PARALLEL_MIN_PAGES
+) -> Iterator[Tuple[int, str]]:
+    """
+    Extracts a PDF across a process pool, yielding (page_number, text) in page order.
+
+    The page range is split into contiguous shards and every worker opens its
+    own PdfReader on the same bytes. `max_workers` defaults to the CPU count;
+    documents shorter than `min_pages`, or a single worker, use the serial path.
+    """
+    buffer = as_buffer(file_buffer)
+    reader = PdfReader(BufferReader(buffer))
+    page_count = len(reader.pages)
+    workers = max_workers or os.cpu_count() or 1
+    if workers <= 1 or page_count < min_pages:
+        yield from _iter_reader_pages(reader)
+        return
+
+    # Forked workers inherit their initargs rather than unpickling them, so
+    # the buffer itself is shared; other start methods need a bytes copy
+    context = mp_context()
+    if context.get_start_method() == "fork":
+        initargs = (buffer,)
+    else:
+        initargs = (bytes(buffer),)
+
+    shards = _page_shards(page_count, workers * SHARDS_PER_WORKER)
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_extraction_worker,
+        initargs=initargs
+    )
+    try:
+        # map() returns shard results in submission order, preserving page order
+        for shard_pages in pool.map(_extract_page_range, shards):
+            yield from shard_pages
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def _page_shards(page_count: int, shard_count: int) -> List[Tuple[int, int]]:
+    """Split range(page_count) into at most `shard_count` contiguous (start, stop) ranges."""
+    shard_count = max(1, min(shard_count, page_count))
+    size, extra = divmod(page_count, shard_count)
+    shards = []
+    start = 0
+    for i in range(shard_count):
+        stop = start + size + (1 if i < extra else 0)
+        shards.append((start, stop))
+        start = stop
+    return shards
+
+def _init_extraction_worker(pdf_buffer: Union[bytes, memoryview]):
+    """Open this worker process's own reader over the shared document bytes."""
+    global _worker_reader
+    _worker_reader = PdfReader(BufferReader(memoryview(pdf_buffer)))
+
+def _extract_page_range(shard: Tuple[int, int]) -> List[Tuple[int, str]]:
+    """Extract (page_number, text) for the pages in one shard."""
+    start, stop = shard
+    pages = []
+    for index in range(start, stop):
+        page_text = _worker_reader.pages[index].extract_text()
+        if page_text:
+            pages.append((index + 1, page_text))
+    return pages
+
+def extract_text_from_pdf(file_buffer: BufferSource, max_workers: Optional[int] = 1) -> str:
+    """
+    Extracts text from every page of a PDF file buffer.
+    Returns a single string with newline-separated page texts.
+
+    `max_workers` other than 1 extracts across a process pool (None uses
+    every CPU); see iter_pdf_pages_parallel.
+    """
+    if max_workers == 1:
+        pages = iter_pdf_pages(file_buffer, buffer_size=0)
+    else:
+        pages = iter_pdf_pages_parallel(file_buffer, max_workers=max_workers)
+    return "\n".join(text for _, text in pages)
+
+def detect_encoding(sample: bytes) -> str:
+    """
+    Guess the encoding of a text file from a prefix sample.
+    Checks for a byte-order mark, then UTF-8, then charset-normalizer if it
+    is installed, and finally falls back to cp1252 or latin-1.
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    try:
+        # Not final: the sample may end partway through a multibyte character
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    try:
+        from charset_normalizer import from_bytes
+        best = from_bytes(bytes(sample)).best()
+        if best is not None:
+            return best.encoding
+    except ImportError:
+        pass
+
+    try:
+        bytes(sample).decode("cp1252")
+        return "cp1252"
+    except UnicodeDecodeError:
+        return "latin-1"
+
+def iter_txt_chunks(
+    file_buffer: BufferSource,
+    block_size: int = TXT_BLOCK_SIZE,
+    encoding: Optional[str] = None
+) -> Iterator[Tuple[int, str]]:
+    """
+    Lazily decodes a text file, yielding (chunk_number, text) like iter_pdf_pages.
+
+    The file is read in `block_size` blocks through an incremental decoder, so
+    multibyte characters split across blocks decode correctly and the whole
+    file is never held in memory. The encoding is detected from a prefix
+    sample unless given. Chunks end on line boundaries where possible.
+    """
+    blocks = _iter_blocks(file_buffer, block_size)
+    head = []
+    if encoding is None:
+        sample = bytearray()
+        for block in blocks:
+            head.append(block)
+            sample += block
+            if len(sample) >= ENCODING_SAMPLE_SIZE:
+                break
+        encoding = detect_encoding(bytes(sample[:ENCODING_SAMPLE_SIZE]))
+
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    chunk_number = 0
+    pending = ""
+
+    def decoded_blocks():
+        for block in head:
+            yield decoder.decode(block)
+        for block in blocks:
+            yield decoder.decode(block)
+        yield decoder.decode(b"", final=True)
+
+    for decoded in decoded_blocks():
+        text = pending + decoded
+        cut = text.rfind("\n") + 1
+        if cut == 0:
+            # No line break yet; carry a bounded amount into the next block
+            if len(text) < block_size:
+                pending = text
+                continue
+            cut = len(text)
+        pending = text[cut:]
+        if cut:
+            chunk_number += 1
+            yield chunk_number, text[:cut]
+
+    if pending:
+        yield chunk_number + 1, pending
+
+def _iter_blocks(file_buffer: BufferSource, block_size: int) -> Iterator[memoryview]:
+    """Yield fixed-size blocks of a buffer or stream without reading it whole."""
+    if isinstance(file_buffer, (bytes, bytearray, memoryview, mmap.mmap)) or hasattr(file_buffer, "getbuffer"):
+        view = as_buffer(file_buffer)
+        for start in range(0, view.nbytes, block_size):
+            yield view[start : start + block_size]
+        return
+
+    while True:
+        block = file_buffer.read(block_size)
+        if not block:
+            return
+        yield memoryview(block)
+
+def extract_text_from_txt(file_buffer: BufferSource, encoding: Optional[str] = None) -> str:
+    """
+    Extracts text from a plain text file buffer, detecting its encoding
+    unless one is given.
+    """
+    return "".join(text for _, text in iter_txt_chunks(file_buffer, encoding=encoding))
+
+_EXTRACTORS = {
+    "pdf": extract_text_from_pdf,
+    "txt": extract_text_from_txt,
+}
+
+# Extractor keyword arguments that change the extracted text, and so the cache key
+_OUTPUT_KWARGS = ("encoding",)
+
+def get_extraction_cache() -> CacheService:
+    """Return the shared extraction cache, stored under data/cache/extraction."""
+    global _extraction_cache
+    if _extraction_cache is None:
+        _extraction_cache = CacheService(cache_dir="data/cache/extraction", max_entries=16)
+    return _extraction_cache
+
+def extract_text_cached(
+    file_buffer: BufferSource,
+    file_type: str = "pdf",
+    cache: Optional[CacheService] = None,
+    **kwargs
+) -> str:
+    """
+    Extracts text through a content-addressed cache.
+
+    The key is the SHA-256 of the uploaded bytes plus the extractor version,
+    so a repeat upload of the same file skips extraction entirely. Extra
+    keyword arguments are passed to the extractor for `file_type`; those
+    that change its output (such as `encoding`) are part of the key.
+    """
+    extractor = _EXTRACTORS.get(file_type)
+    if extractor is None:
+        raise ValueError(f"Unsupported file type: {file_type}")
+
+    cache = cache or get_extraction_cache()
+    buffer = as_buffer(file_buffer)
+    key = content_key(
+        buffer,
+        file_type,
+        EXTRACTOR_VERSION,
+        PyPDF2.__version__,
+        *(f"{name}={kwargs[name]}" for name in _OUTPUT_KWARGS if kwargs.get(name) is not None)
+    )
+    text = cache.get_text(key)
+    if text is None:
+        text = extractor(buffer, **kwargs)
+        cache.put_text(key, text)
+    return text
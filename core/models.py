@@ -0,0 +1,223 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Summarization model id or local path; point this at a small checkpoint
+# (e.g. "sshleifer/distilbart-cnn-6-6") for quick offline runs
+DEFAULT_SUMMARY_MODEL = os.environ.get("EDU_HELPER_SUMMARY_MODEL", "facebook/bart-large-cnn")
+
+# Inference backend for summarization: "torch" (fp32), "int8" (torch dynamic
+# quantization of linear layers) or "onnx" (ONNX Runtime via optimum)
+DEFAULT_SUMMARY_BACKEND = os.environ.get("EDU_HELPER_SUMMARY_BACKEND", "torch")
+
+# Converted models are kept here so conversion only happens once
+CONVERTED_MODEL_DIR = os.environ.get("EDU_HELPER_CONVERTED_MODEL_DIR", "data/models")
+
+SUMMARY_BACKENDS = ("torch", "int8", "onnx")
+
+# Seconds a model may go unused before the registry unloads it
+DEFAULT_IDLE_TTL = float(os.environ.get("EDU_HELPER_MODEL_IDLE_TTL", 30 * 60))
+
+ModelKey = Tuple[str, str]
+
+def summary_model_id(model_name: Optional[str] = None, backend: Optional[str] = None) -> str:
+    """
+    Registry id for a summarization model on a backend, e.g.
+    "facebook/bart-large-cnn@int8". The fp32 torch backend has no suffix.
+    """
+    model_name = model_name or DEFAULT_SUMMARY_MODEL
+    backend = backend or DEFAULT_SUMMARY_BACKEND
+    if backend not in SUMMARY_BACKENDS:
+        raise ValueError(f"Unknown summarization backend: {backend}")
+    return model_name if backend == "torch" else f"{model_name}@{backend}"
+
+def split_backend(model_id: str) -> Tuple[str, str]:
+    """Split a registry id into (model name, backend)."""
+    model_name, _, backend = model_id.rpartition("@")
+    if not model_name or backend not in SUMMARY_BACKENDS:
+        return model_id, "torch"
+    return model_name, backend
+
+def _load_summarization_pipeline(model_id: str):
+    """Build a transformers summarization pipeline on the backend named in model_id."""
+    from transformers import pipeline
+    model_name, backend = split_backend(model_id)
+    if backend == "int8":
+        return _load_int8_pipeline(model_name)
+    if backend == "onnx":
+        return _load_onnx_pipeline(model_name)
+    return pipeline("summarization", model=model_name)
+
+def _converted_path(model_name: str, backend: str) -> str:
+    """Where the converted copy of a model lives on disk."""
+    return os.path.join(CONVERTED_MODEL_DIR, model_name.replace("/", "--"), backend)
+
+def _load_int8_pipeline(model_name: str):
+    """
+    Summarization pipeline with linear layers dynamically quantized to int8.
+    The quantized weights are saved on first use; later loads rebuild the
+    quantized model from its config and skip the fp32 checkpoint.
+    """
+    import torch
+    from transformers import AutoConfig, AutoModelForSeq2SeqLM, AutoTokenizer, pipeline
+    path = os.path.join(_converted_path(model_name, "int8"), "state_dict.pt")
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    if os.path.exists(path):
+        model = AutoModelForSeq2SeqLM.from_config(AutoConfig.from_pretrained(model_name))
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        model.load_state_dict(torch.load(path))
+    else:
+        model = AutoModelForSeq2SeqLM.from_pretrained(model_name)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            torch.save(model.state_dict(), tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error saving quantized model: {str(e)}")
+    model.eval()
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+def _load_onnx_pipeline(model_name: str):
+    """
+    Summarization pipeline on ONNX Runtime. Requires optimum[onnxruntime];
+    the exported graphs are saved on first use.
+    """
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+    from transformers import AutoTokenizer, pipeline
+    path = _converted_path(model_name, "onnx")
+    if os.path.isdir(path):
+        model = ORTModelForSeq2SeqLM.from_pretrained(path)
+        tokenizer = AutoTokenizer.from_pretrained(path)
+    else:
+        model = ORTModelForSeq2SeqLM.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            model.save_pretrained(tmp_path)
+            tokenizer.save_pretrained(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error saving ONNX model: {str(e)}")
+    return pipeline("summarization", model=model, tokenizer=tokenizer)
+
+def _load_tokenizer(model_id: str):
+    """Load just the tokenizer of a model, e.g. for chunking in a parent process."""
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(split_backend(model_id)[0])
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded models, shared across Streamlit sessions.
+
+    Models load lazily on first use, or up front via warmup(). Each model has
+    its own lock so concurrent sessions never load the same weights twice,
+    while different models can load in parallel. Models unused for
+    `idle_ttl` seconds are dropped by evict_idle(), which get() calls
+    opportunistically and the optional reaper thread calls periodically.
+    """
+    def __init__(self, idle_ttl: float = DEFAULT_IDLE_TTL):
+        self.idle_ttl = idle_ttl
+        self._loaders: Dict[str, Callable[[str], object]] = {
+            "summarization": _load_summarization_pipeline,
+            "tokenizer": _load_tokenizer
+        }
+        self._defaults: Dict[str, str] = {
+            "summarization": summary_model_id(),
+            "tokenizer": DEFAULT_SUMMARY_MODEL
+        }
+        self._models: Dict[ModelKey, object] = {}
+        self._last_used: Dict[ModelKey, float] = {}
+        self._key_locks: Dict[ModelKey, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._reaper = None
+
+    def register_loader(self, task: str, loader: Callable[[str], object], default_model: Optional[str] = None):
+        """Set the function that loads models for a task, e.g. a stand-in for tests."""
+        with self._lock:
+            self._loaders[task] = loader
+            if default_model is not None:
+                self._defaults[task] = default_model
+
+    def set_default_model(self, task: str, model_id: str):
+        """Choose the model used when callers don't name one."""
+        with self._lock:
+            self._defaults[task] = model_id
+
+    def default_model(self, task: str) -> str:
+        return self._defaults[task]
+
+    def get(self, task: str, model_id: Optional[str] = None):
+        """Return the loaded model for (task, model_id), loading it if needed."""
+        key = (task, model_id or self._defaults[task])
+        self.evict_idle()
+
+        with self._lock:
+            model = self._models.get(key)
+            if model is not None:
+                self._last_used[key] = time.monotonic()
+                return model
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+            loader = self._loaders[task]
+
+        with key_lock:
+            # Another session may have finished loading while we waited
+            with self._lock:
+                model = self._models.get(key)
+            if model is None:
+                model = loader(key[1])
+            with self._lock:
+                self._models[key] = model
+                self._last_used[key] = time.monotonic()
+        return model
+
+    def warmup(self, task: str, model_id: Optional[str] = None):
+        """Load a model ahead of the first request."""
+        return self.get(task, model_id)
+
+    def is_loaded(self, task: str, model_id: Optional[str] = None) -> bool:
+        with self._lock:
+            return (task, model_id or self._defaults[task]) in self._models
+
+    def loaded(self) -> List[ModelKey]:
+        """Return the (task, model_id) pairs currently in memory."""
+        with self._lock:
+            return list(self._models)
+
+    def evict(self, task: str, model_id: Optional[str] = None) -> bool:
+        """Unload one model. Returns whether it was loaded."""
+        key = (task, model_id or self._defaults[task])
+        with self._lock:
+            self._last_used.pop(key, None)
+            return self._models.pop(key, None) is not None
+
+    def evict_idle(self, now: Optional[float] = None) -> List[ModelKey]:
+        """Unload models unused for longer than idle_ttl and return their keys."""
+        if self.idle_ttl is None or self.idle_ttl <= 0:
+            return []
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            expired = [key for key, used in self._last_used.items() if now - used > self.idle_ttl]
+            for key in expired:
+                self._models.pop(key, None)
+                self._last_used.pop(key, None)
+        return expired
+
+    def start_reaper(self, interval: float = 60.0):
+        """Start a daemon thread that evicts idle models every `interval` seconds."""
+        with self._lock:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+
+            def reap():
+                while True:
+                    time.sleep(interval)
+                    self.evict_idle()
+
+            self._reaper = threading.Thread(target=reap, name="model-reaper", daemon=True)
+            self._reaper.start()
+
+# Shared by every session in this process
+model_registry = ModelRegistry()
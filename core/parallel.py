@@ -0,0 +1,11 @@
+import multiprocessing
+
+def mp_context():
+    """
+    The multiprocessing context for process pools: the start method the
+    application chose, else the platform default, without fixing it
+    process-wide as multiprocessing.get_start_method() would.
+    """
+    method = multiprocessing.get_start_method(allow_none=True)
+    # The first supported method is the platform default
+    return multiprocessing.get_context(method or multiprocessing.get_all_start_methods()[0])
@@ -1,27 +1,113 @@
 import re
+from functools import lru_cache
+from typing import Iterable, Iterator, Tuple
+
+# Special characters outside basic punctuation
+_SPECIAL_RE = re.compile(r'[^\w\s.,!?;:\'"()-]+')
+
+# The same characters as a translate table, for the ASCII fast path
+_ASCII_SPECIAL_TABLE = {cp: None for cp in range(128) if _SPECIAL_RE.match(chr(cp))}
+
+# Runs of punctuation marks, possibly separated by spaces. Splitting on this
+# leaves the text between runs at even indexes and the runs at odd ones.
+_MARKS_RE = re.compile(r'([,.!?;:](?: *[,.!?;:])*)')
+
+# Repeated marks within a run of punctuation
+_REPEAT_RE = re.compile(r'\.{3,}|!{2,}|\?{2,}')
+
+# Characters that are always kept verbatim and never touch a neighbour's
+# cleaning, so a stream can be cut right after one of them
+_ANCHOR_CHARS = "_'\"()-"
+
+def _collapse_repeat(match) -> str:
+    mark = match.group()[0]
+    return '...' if mark == '.' else mark
+
+@lru_cache(maxsize=4096)
+def _rework_marks(cluster: str) -> str:
+    # Collapse repeats within each space-separated run, drop the spaces, then
+    # space out each successive pair of marks. Clusters repeat a lot, hence the cache.
+    marks = ''.join(_REPEAT_RE.sub(_collapse_repeat, run) for run in cluster.split(' '))
+    pairs = [marks[i : i + 2] for i in range(0, len(marks), 2)]
+    return ''.join(pair[0] + ' ' + pair[1] if len(pair) == 2 else pair for pair in pairs)
+
+def _last_anchor(text: str) -> int:
+    """Return the index just past the last anchor character in text, or 0."""
+    for i in range(len(text) - 1, -1, -1):
+        c = text[i]
+        if c.isalnum() or c in _ANCHOR_CHARS:
+            return i + 1
+    return 0
 
 class StudyMaterialParser:
     def __init__(self):
         pass
-    
+
     def clean_extracted_text(self, text):
         """Clean and normalize extracted text."""
         if not text:
             return ""
-        
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
+
+        return self._clean(text).strip()
+
+    def clean_stream(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Clean text that arrives in chunks, yielding cleaned pieces whose
+        concatenation equals clean_extracted_text of the joined chunks.
+        Text after the last safe cut point is carried into the next chunk.
+        """
+        carry = ""
+        at_start = True
+        for chunk in chunks:
+            if not chunk:
+                continue
+            cut = _last_anchor(chunk)
+            if not cut:
+                carry += chunk
+                continue
+            cut += len(carry)
+            text = carry + chunk
+            carry = text[cut:]
+            cleaned = self._clean(text[:cut])
+            if at_start:
+                cleaned = cleaned.lstrip()
+                at_start = False
+            yield cleaned
+
+        cleaned = self._clean(carry)
+        cleaned = cleaned.strip() if at_start else cleaned.rstrip()
+        if cleaned:
+            yield cleaned
+
+    def _clean(self, text: str) -> str:
+        """Whitespace, character and punctuation cleanup, without the final strip."""
+        # Remove extra whitespace; edge runs are kept as one space so that
+        # stream pieces still join up correctly
+        collapsed = ' '.join(text.split())
+        if not collapsed:
+            return ' ' if text else ''
+        if text[0].isspace():
+            collapsed = ' ' + collapsed
+        if text[-1].isspace():
+            collapsed += ' '
+
         # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s.,!?;:\'"()-]', '', text)
-        
-        # Remove multiple consecutive punctuation marks
-        text = re.sub(r'[.]{3,}', '...', text)
-        text = re.sub(r'[!]{2,}', '!', text)
-        text = re.sub(r'[?]{2,}', '?', text)
-        
-        # Clean up spacing around punctuation
-        text = re.sub(r'\s+([,.!?;:])', r'\1', text)
-        text = re.sub(r'([,.!?;:])\s*([,.!?;:])', r'\1 \2', text)
-        
-        return text.strip()
+        if collapsed.isascii():
+            collapsed = collapsed.translate(_ASCII_SPECIAL_TABLE)
+        else:
+            collapsed = _SPECIAL_RE.sub('', collapsed)
+
+        # Collapse repeated punctuation and clean up spacing around it:
+        # spaces before a run of marks are dropped and the run is reworked
+        parts = _MARKS_RE.split(collapsed)
+        for i in range(1, len(parts), 2):
+            parts[i - 1] = parts[i - 1].rstrip(' ')
+            parts[i] = _rework_marks(parts[i])
+        return ''.join(parts)
+
+    def clean_pages(self, pages: Iterable[Tuple[int, str]]) -> Iterator[Tuple[int, str]]:
+        """Clean (page_number, text) pairs as they arrive, e.g. from iter_pdf_pages."""
+        for page_number, text in pages:
+            cleaned = self.clean_extracted_text(text)
+            if cleaned:
+                yield page_number, cleaned
@@ -1,39 +1,200 @@
+import heapq
+import itertools
 import re
 import random
-from typing import List, Dict
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple, Union
+import numpy as np
+from .distractors import VocabularyIndex
+from .document import Document, as_document
+from .parallel import mp_context
+from .terms import content_words
 
-def generate_flashcards(text: str, num_cards: int = 5) -> List[Dict[str, str]]:
-    """Generate flashcards from text."""
+# Phrases that usually introduce a definition, matched once over the whole
+# text. The lookahead on first letters lets the scan skip most positions.
+_DEFINITION_RE = re.compile(
+    r'\b(?=[iawrmc])(?:(?:is|are|was|were)\s+(?:a|an|the|defined\s+as|called|known\s+as)\b'
+    r'|refers?\s+to\b|means\b|(?:includes?|contains?|consists\s+of)\b)',
+    re.IGNORECASE
+)
+
+# Score bonus for a definition-pattern hit; term salience is scaled to [0, 1]
+_DEFINITION_WEIGHT = 0.5
+
+# Card types the builders produce; the definition builder falls back to
+# completion cards
+CARD_TYPES = ("cloze", "definition", "completion")
+
+def generate_flashcards(
+    text: Union[str, Document],
+    num_cards: int = 5,
+    rng: Optional[random.Random] = None
+) -> List[Dict[str, str]]:
+    """
+    Generate flashcards from text or a segmented Document.
+
+    Every sentence is scored (see score_sentences) and cards come from the
+    best sentence in each of `num_cards` equal spans of the document first,
+    then from the best remaining sentences, so long documents are covered
+    end to end. Cards are returned in document order. Random choices use
+    `rng` if given (see document_rng), else the global random module.
+    """
     
-    if not text or text.strip() == "":
+    if not text:
         return []
     
-    # Split text into sentences
-    sentences = re.split(r'[.!?]+', text)
-    sentences = [s.strip() for s in sentences if len(s.strip()) > 30]
+    document = as_document(text)
+    if document.text.strip() == "" or num_cards <= 0:
+        return []
     
-    if not sentences:
+    picked = itertools.islice(iter_cards(document, sections=num_cards, rng=rng), num_cards)
+    return [card for _, card in sorted(picked, key=lambda item: item[0])]
+
+def generate_cards(
+    text: Union[str, Document],
+    counts: Dict[str, int],
+    rng: Optional[random.Random] = None
+) -> List[Dict[str, str]]:
+    """
+    Generate exactly the requested number of cards of each type, e.g.
+    {"cloze": 10, "definition": 5}, or fewer if the text runs out. Stops
+    reading sentences as soon as every count is met. Cards are returned in
+    document order.
+    """
+    if not text:
+        return []
+    document = as_document(text)
+    counts = {card_type: n for card_type, n in counts.items() if n > 0}
+    if document.text.strip() == "" or not counts:
         return []
     
-    flashcards = []
+    cards = iter_cards(document, types=counts, sections=sum(counts.values()), rng=rng)
+    picked = take_cards(cards, counts)
+    return [card for _, card in sorted(picked, key=lambda item: item[0])]
+
+def iter_sentences(document: Document, sections: int = 1) -> Iterator[Tuple[int, str, bool]]:
+    """
+    Yield (index, sentence, looks_like_definition) for card-worthy sentences,
+    best first but covering `sections` spans of the document (see
+    _ranked_indexes). Terminal punctuation is stripped.
+    """
+    scores, definitions = score_sentences(document)
+    for index in _ranked_indexes(scores, sections):
+        # Use the shared sentence segmentation, without terminal punctuation
+        yield index, document.sentence(index).rstrip('.!?'), bool(definitions[index])
+
+def iter_cards(
+    document: Document,
+    types: Iterable[str] = CARD_TYPES,
+    sections: int = 1,
+    rng: Optional[random.Random] = None
+) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """
+    Lazily build (sentence index, card) pairs of the given types, at most one
+    card per sentence. Only builders that can produce a requested type run.
+    """
+    rng = rng or random
+    types = set(types)
+    builders = []
+    if "definition" in types or "completion" in types:
+        builders.append(_create_definition_card)
+    if "cloze" in types:
+        builders.append(lambda sentence: _create_cloze_card(sentence, rng))
+    if not builders:
+        return
     
-    # Generate different types of flashcards
-    for i in range(min(num_cards, len(sentences))):
-        sentence = sentences[i]
-        
-        if i % 2 == 0:
-            # Cloze deletion cards
-            card = _create_cloze_card(sentence)
-        else:
-            # Definition cards
-            card = _create_definition_card(sentence)
-        
-        if card:
-            flashcards.append(card)
+    for index, sentence, definition_like in iter_sentences(document, sections):
+        # Definition-like sentences make definition cards, the rest cloze cards
+        ordered = builders if definition_like else builders[::-1]
+        for builder in ordered:
+            card = builder(sentence)
+            if card and card["type"] in types:
+                yield index, card
+                break
+
+def take_cards(cards: Iterable[Tuple[int, Dict[str, str]]], counts: Dict[str, int]) -> List[Tuple[int, Dict[str, str]]]:
+    """Take cards until each type reaches its count, without reading further."""
+    wanted = dict(counts)
+    remaining = sum(wanted.values())
+    picked = []
+    if remaining <= 0:
+        return picked
+    for index, card in cards:
+        if wanted.get(card["type"], 0) > 0:
+            wanted[card["type"]] -= 1
+            remaining -= 1
+            picked.append((index, card))
+            if remaining == 0:
+                break
+    return picked
+
+def score_sentences(document: Document) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score every sentence for flashcard use in one pass over the document.
+
+    A sentence's term salience sums, over its content words, how often the
+    word recurs in the document times how specific it is (smoothed IDF),
+    normalized by the square root of the sentence's word count. Sentences
+    containing a definition pattern get a bonus. Sentences too short for a
+    card score -inf. Returns the scores and the definition-hit mask.
+    """
+    sentences = document.sentences()
+    n = len(sentences)
+    vocabulary = {}
+    term_ids = []
+    distinct_ids = []
+    word_counts = []
+    for sentence in sentences:
+        ids = [vocabulary.setdefault(word, len(vocabulary)) for word in content_words(sentence)]
+        term_ids.extend(ids)
+        distinct_ids.extend(set(ids))
+        word_counts.append(len(ids))
+    
+    term_ids = np.asarray(term_ids, dtype=np.int64)
+    word_counts = np.asarray(word_counts, dtype=np.int64)
+    owners = np.repeat(np.arange(n), word_counts)
+    
+    collection_frequency = np.bincount(term_ids, minlength=len(vocabulary))
+    document_frequency = np.bincount(np.asarray(distinct_ids, dtype=np.int64), minlength=len(vocabulary))
+    weights = np.log1p(collection_frequency) * np.log((1.0 + n) / (1.0 + document_frequency))
+    salience = np.bincount(owners, weights=weights[term_ids], minlength=n)
+    salience /= np.sqrt(np.maximum(word_counts, 1))
+    if n and salience.max() > 0:
+        salience /= salience.max()
+    
+    # Map definition matches to sentences by their offsets
+    offsets = np.fromiter((m.start() for m in _DEFINITION_RE.finditer(document.text)), dtype=np.int64)
+    owner = np.searchsorted(np.asarray(document.sentence_starts, dtype=np.int64), offsets, side='right') - 1
+    definitions = np.bincount(owner[owner >= 0], minlength=n)[:n] > 0
+    
+    scores = salience + _DEFINITION_WEIGHT * definitions
+    eligible = np.fromiter((len(s.rstrip('.!?')) > 30 for s in sentences), dtype=bool, count=n)
+    scores[~eligible] = -np.inf
+    return scores, definitions
+
+def _ranked_indexes(scores: np.ndarray, sections: int) -> Iterator[int]:
+    """
+    Yield eligible sentence indexes: first the best sentence of each of
+    `sections` equal spans of the document, in document order, then all
+    others best first from a heap.
+    """
+    n = len(scores)
+    bounds = np.linspace(0, n, min(sections, n) + 1).astype(int)
+    seen = set()
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        if hi > lo:
+            best = lo + int(np.argmax(scores[lo:hi]))
+            if np.isfinite(scores[best]):
+                seen.add(best)
+                yield best
     
-    return flashcards
+    heap = [(-score, i) for i, score in enumerate(scores.tolist()) if score != -np.inf and i not in seen]
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[1]
 
-def _create_cloze_card(sentence: str) -> Dict[str, str]:
+def _create_cloze_card(sentence: str, rng=random) -> Dict[str, str]:
     """Create a cloze deletion flashcard."""
     words = sentence.split()
     if len(words) < 6:
@@ -53,7 +214,7 @@ def _create_cloze_card(sentence: str) -> Dict[str, str]:
         important_words = [(middle_idx, words[middle_idx], re.sub(r'[^\w]', '', words[middle_idx]))]
     
     # Choose a random important word
-    word_idx, original_word, clean_word = random.choice(important_words)
+    word_idx, original_word, clean_word = rng.choice(important_words)
     
     # Create the cloze
     cloze_sentence = words.copy()
@@ -118,27 +279,220 @@ def _create_definition_card(sentence: str) -> Dict[str, str]:
     
     return None
 
-def generate_quiz(text: str, num_questions: int = 3) -> List[Dict]:
-    """Generate multiple choice quiz questions."""
+def generate_quiz(
+    text: Union[str, Document],
+    num_questions: int = 3,
+    encode=None,
+    rng: Optional[random.Random] = None
+) -> List[Dict]:
+    """
+    Generate multiple choice quiz questions. Distractors come from the
+    document's own vocabulary (see VocabularyIndex); pass `encode`, e.g. a
+    SentenceTransformer's encode method, to pick them by embedding similarity.
+    """
     
-    flashcards = generate_flashcards(text, num_questions * 2)
+    if not text:
+        return []
+    
+    rng = rng or random
+    document = as_document(text)
+    flashcards = generate_cards(document, {"cloze": num_questions}, rng=rng)
+    if not flashcards:
+        return []
+    vocabulary = VocabularyIndex(document, encode=encode)
     quiz_questions = []
     
-    for card in flashcards[:num_questions]:
-        if card['type'] == 'cloze':
-            # Convert cloze to multiple choice
-            question = {
-                "question": card['front'].replace("_____", "______"),
-                "correct_answer": card['back'],
-                "options": [card['back']],
-                "type": "multiple_choice"
-            }
-            
-            # Add dummy options (this is a simple implementation)
-            dummy_options = ["option A", "option B", "option C"]
-            question["options"].extend(dummy_options[:3])
-            random.shuffle(question["options"])
-            
-            quiz_questions.append(question)
+    for card in flashcards:
+        # Convert cloze to multiple choice
+        question = {
+            "question": card['front'].replace("_____", "______"),
+            "correct_answer": card['back'],
+            "options": [card['back']],
+            "type": "multiple_choice"
+        }
+        
+        question["options"].extend(vocabulary.distractors(card['back'], 3, rng=rng))
+        rng.shuffle(question["options"])
+        
+        quiz_questions.append(question)
     
     return quiz_questions
+
+def document_rng(text: Union[str, Document], seed: int = 0) -> random.Random:
+    """
+    Random generator for one document, seeded from `seed` and the document's
+    content hash, so its cards don't depend on which other documents are in
+    the batch or which worker handles it.
+    """
+    return random.Random(f"{seed}:{as_document(text).content_hash}")
+
+def generate_flashcards_batch(
+    texts: Iterable[Union[str, Document]],
+    num_cards: int = 5,
+    seed: int = 0,
+    max_workers: Optional[int] = None
+) -> Iterator[Tuple[int, List[Dict[str, str]]]]:
+    """
+    Generate a deck per document across a process pool, yielding
+    (position in `texts`, cards) as each deck completes. Each document gets
+    its own document_rng, so output is the same for any worker count.
+    `max_workers=1` runs in this process.
+    """
+    jobs = [
+        (position, text.text if isinstance(text, Document) else text, num_cards, seed)
+        for position, text in enumerate(texts)
+    ]
+    if max_workers == 1 or len(jobs) < 2:
+        for job in jobs:
+            yield _flashcards_job(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context()) as pool:
+        futures = [pool.submit(_flashcards_job, job) for job in jobs]
+        try:
+            for future in as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+def _flashcards_job(job: Tuple) -> Tuple[int, List[Dict[str, str]]]:
+    """Build one document's deck with its own seeded generator."""
+    position, text, num_cards, seed = job
+    if not text:
+        return position, []
+    document = Document(text)
+    return position, generate_flashcards(document, num_cards, rng=document_rng(document, seed))
+
+# SM-2 parameters
+_INITIAL_EASE = 2.5
+_MIN_EASE = 1.3
+_DAY = 86400
+
+class ReviewScheduler:
+    """
+    SM-2 spaced-repetition scheduler over cards numbered 0..n-1.
+
+    Review state lives in NumPy columns (ease, interval in days, successful
+    repetitions, due time in whole seconds) rather than per-card dicts. Due
+    cards are served from a heap of `due << 32 | card` integers; grading
+    pushes a fresh entry and leaves the old one to be skipped when it
+    surfaces (lazy invalidation), so next_due() is O(1) amortized.
+    """
+    def __init__(self, capacity: int = 1024):
+        capacity = max(1, capacity)
+        self.ease = np.full(capacity, _INITIAL_EASE, dtype=np.float32)
+        self.interval = np.zeros(capacity, dtype=np.float32)
+        self.repetitions = np.zeros(capacity, dtype=np.int32)
+        self.due = np.zeros(capacity, dtype=np.int64)
+        self.size = 0
+        self._heap = []
+
+    def __len__(self) -> int:
+        return self.size
+
+    def add_cards(self, count: int, now: Optional[float] = None) -> np.ndarray:
+        """Add `count` new cards, due immediately. Returns their ids."""
+        now = int(time.time() if now is None else now)
+        start, end = self.size, self.size + count
+        if end > len(self.due):
+            self._grow(end)
+        self.ease[start:end] = _INITIAL_EASE
+        self.interval[start:end] = 0
+        self.repetitions[start:end] = 0
+        self.due[start:end] = now
+        self.size = end
+        ids = np.arange(start, end)
+        self._schedule(ids)
+        return ids
+
+    def next_due(self, now: Optional[float] = None) -> Optional[int]:
+        """Return the card that has been due longest, or None if none is due."""
+        now = int(time.time() if now is None else now)
+        heap = self._heap
+        while heap:
+            key = heap[0]
+            card = key & 0xFFFFFFFF
+            if self.due[card] != key >> 32:
+                # Stale entry from before the card was last graded
+                heapq.heappop(heap)
+                continue
+            return card if key >> 32 <= now else None
+        return None
+
+    def due_cards(self, now: Optional[float] = None) -> np.ndarray:
+        """Return the ids of all due cards, longest overdue first."""
+        now = int(time.time() if now is None else now)
+        due = self.due[:self.size]
+        cards = np.flatnonzero(due <= now)
+        return cards[np.argsort(due[cards], kind="stable")]
+
+    def grade(self, card: int, quality: int, now: Optional[float] = None):
+        """Record one review graded 0 (blackout) to 5 (perfect)."""
+        self.grade_many(np.array([card]), np.array([quality]), now)
+
+    def grade_many(self, cards, qualities, now: Optional[float] = None):
+        """Record a batch of reviews, one per distinct card, in one vectorized SM-2 update."""
+        now = int(time.time() if now is None else now)
+        cards = np.asarray(cards, dtype=np.int64)
+        quality = np.clip(np.asarray(qualities, dtype=np.float32), 0, 5)
+        if cards.size == 0:
+            return
+
+        passed = quality >= 3
+        repetitions = np.where(passed, self.repetitions[cards] + 1, 0)
+        interval = np.where(
+            repetitions <= 1, 1.0,
+            np.where(repetitions == 2, 6.0, np.round(self.interval[cards] * self.ease[cards]))
+        )
+        miss = 5 - quality
+        ease = np.maximum(_MIN_EASE, self.ease[cards] + 0.1 - miss * (0.08 + miss * 0.02))
+
+        self.repetitions[cards] = repetitions
+        self.interval[cards] = interval
+        self.ease[cards] = ease
+        self.due[cards] = now + (interval * _DAY).astype(np.int64)
+        self._schedule(cards)
+
+    def save(self, path: str):
+        """Write the review state to a .npz file."""
+        n = self.size
+        np.savez(path, ease=self.ease[:n], interval=self.interval[:n],
+                 repetitions=self.repetitions[:n], due=self.due[:n])
+
+    @classmethod
+    def load(cls, path: str) -> "ReviewScheduler":
+        """Read review state written by save()."""
+        with np.load(path) as data:
+            due = data["due"]
+            n = len(due)
+            scheduler = cls(n)
+            scheduler.ease[:n] = data["ease"]
+            scheduler.interval[:n] = data["interval"]
+            scheduler.repetitions[:n] = data["repetitions"]
+            scheduler.due[:n] = due
+        scheduler.size = n
+        scheduler._rebuild_heap()
+        return scheduler
+
+    def _grow(self, needed: int):
+        capacity = max(needed, 2 * len(self.due))
+        for name in ("ease", "interval", "repetitions", "due"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def _schedule(self, cards: np.ndarray):
+        """Queue cards at their due times; big batches rebuild the heap instead."""
+        if len(cards) > len(self._heap) // 8:
+            self._rebuild_heap()
+            return
+        for due, card in zip(self.due[cards].tolist(), cards.tolist()):
+            heapq.heappush(self._heap, due << 32 | card)
+
+    def _rebuild_heap(self):
+        """Rebuild the heap from the columns, dropping stale entries."""
+        # Python ints, so keys don't overflow for far-future due times
+        self._heap = [due << 32 | card for card, due in enumerate(self.due[:self.size].tolist())]
+        heapq.heapify(self._heap)
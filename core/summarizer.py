@@ -1,52 +1,656 @@
-import re
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from services.cache import CacheService, content_key
+from .chunker import CHUNKER_VERSION, approx_token_count, chunk_document
+from .document import Document, as_document
+from .models import model_registry
+from .parallel import mp_context
 
-def summarize_text(text: str, max_length: int = 150, min_length: int = 50) -> str:
+# Chunks per forward pass; tune per node with benchmarks/bench_summarizer.py
+DEFAULT_BATCH_SIZE = int(os.environ.get("EDU_HELPER_SUMMARY_BATCH_SIZE", 4))
+
+# Worker processes for hierarchical summarization; each keeps its own model copy loaded
+DEFAULT_HIERARCHY_WORKERS = int(os.environ.get("EDU_HELPER_SUMMARY_WORKERS", 2))
+
+# Partial summaries merged per reduce step
+DEFAULT_FAN_IN = 4
+
+# Documents longer than this are summarized hierarchically by generate_summary
+HIERARCHICAL_MIN_CHARS = 50_000
+
+# (max_length, min_length) for the sidebar's summary length setting
+SUMMARY_LENGTHS = {
+    "short": (80, 30),
+    "medium": (150, 50),
+    "long": (250, 100),
+}
+
+# Share of the text kept by extractive pre-reduction for the sidebar's setting
+REDUCTION_LEVELS = {
+    "off": None,
+    "light": 0.6,
+    "medium": 0.4,
+    "aggressive": 0.25,
+}
+
+# Memory budget in bytes for each summary cache; both also persist to disk
+SUMMARY_CACHE_BYTES = int(os.environ.get("EDU_HELPER_SUMMARY_CACHE_BYTES", 8 * 1024 * 1024))
+
+_summary_cache = None
+_chunk_summary_cache = None
+
+# Long-lived hierarchical summarization pools, keyed by (model_id, workers)
+_summary_pools: Dict[Tuple[str, int], "_SummaryPool"] = {}
+_summary_pools_lock = threading.Lock()
+
+# Models whose pool workers failed to start; later calls summarize in-process
+_failed_pool_models = set()
+
+def get_summary_cache() -> CacheService:
+    """Return the shared cache of whole-document summaries, stored under data/cache/summaries."""
+    global _summary_cache
+    if _summary_cache is None:
+        _summary_cache = CacheService(
+            cache_dir="data/cache/summaries",
+            max_entries=256,
+            max_bytes=SUMMARY_CACHE_BYTES
+        )
+    return _summary_cache
+
+def get_chunk_summary_cache() -> CacheService:
+    """Return the shared cache of per-chunk summaries, stored under data/cache/chunk_summaries."""
+    global _chunk_summary_cache
+    if _chunk_summary_cache is None:
+        _chunk_summary_cache = CacheService(
+            cache_dir="data/cache/chunk_summaries",
+            max_entries=4096,
+            max_bytes=SUMMARY_CACHE_BYTES
+        )
+    return _chunk_summary_cache
+
+def _summary_key(*parts) -> str:
+    """Cache key for a summary of some content under the given settings."""
+    return content_key(*(str(part) for part in parts), CHUNKER_VERSION)
+
+def generate_summary(
+    text: Union[str, Document],
+    length: str = "medium",
+    model_id: Optional[str] = None,
+    reduction: str = "off"
+) -> str:
+    """
+    Summarize text at one of the SUMMARY_LENGTHS presets, optionally
+    pre-reduced at one of the REDUCTION_LEVELS.
+    """
+    max_length, min_length = SUMMARY_LENGTHS.get(length, SUMMARY_LENGTHS["medium"])
+    keep_ratio = REDUCTION_LEVELS.get(reduction)
+    document = as_document(text) if text else text
+    if document and len(document.text) > HIERARCHICAL_MIN_CHARS:
+        return summarize_hierarchical(
+            document,
+            target_tokens=max_length * 2,
+            max_length=max_length,
+            min_length=min_length,
+            model_id=model_id,
+            keep_ratio=keep_ratio
+        )
+    return summarize_text(
+        document,
+        max_length=max_length,
+        min_length=min_length,
+        model_id=model_id,
+        keep_ratio=keep_ratio
+    )
+
+def summarize_text(
+    text: Union[str, Document],
+    max_length: int = 150,
+    min_length: int = 50,
+    model_id: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    stats: Optional[Dict] = None,
+    use_cache: bool = True,
+    keep_ratio: Optional[float] = None,
+    keep_tokens: Optional[int] = None
+) -> str:
     """
     Generates an abstractive summary using transformers if available;
     falls back to a simple extractive heuristic on error or missing library.
+    Chunks go through the model `batch_size` at a time; `use_cache` reuses
+    document and chunk summaries; `keep_ratio`/`keep_tokens` first cut the
+    text to its top TextRank sentences; `stats` receives run figures.
+    """
+    if not text:
+        return ""
+    document = as_document(text)
+    text = document.text
+    if not text.strip():
+        return ""
+
+    model_id = model_id or model_registry.default_model("summarization")
+    key = _summary_key(
+        "document", document.content_hash, model_id, max_length, min_length, keep_ratio, keep_tokens
+    )
+    if use_cache:
+        cached = get_summary_cache().get_text(key)
+        if stats is not None:
+            stats["cache_hit"] = cached is not None
+        if cached is not None:
+            return cached
+
+    try:
+        summarizer = _load_summarizer(model_id)
+        reduced = _prereduce(document, keep_ratio, keep_tokens, stats)
+        summaries = _summarize_chunks(
+            summarizer, reduced, max_length, min_length, batch_size, stats,
+            model_id=model_id if use_cache else None
+        )
+        summary = " ".join(summaries).strip()
+    except Exception:
+        # Fallback extractive summarization; not cached, so the model is retried
+        return _simple_extractive_summary(document)
+
+    if use_cache:
+        get_summary_cache().put_text(key, summary)
+    return summary
+
+def summarize_text_stream(
+    text: Union[str, Document],
+    max_length: int = 150,
+    min_length: int = 50,
+    model_id: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    keep_ratio: Optional[float] = None,
+    keep_tokens: Optional[int] = None,
+    cancel: Optional[threading.Event] = None
+) -> Iterator[Dict]:
+    """
+    Like summarize_text, but yields a dict per chunk as it is ready: `index`,
+    `summary`, `cached`, `fallback` (the extractive summary replacing earlier
+    ones after a model error) and progress as `done`, `total`, `elapsed` and
+    `eta`. Stop early by closing the generator or setting `cancel`.
+    """
+    if not text:
+        return
+    document = as_document(text)
+    if not document.text.strip():
+        return
+
+    started = time.perf_counter()
+    model_id = model_id or model_registry.default_model("summarization")
+    try:
+        summarizer = _load_summarizer(model_id)
+        reduced = _prereduce(document, keep_ratio, keep_tokens)
+        chunks = chunk_document(reduced, tokenizer=getattr(summarizer, "tokenizer", None), stable=True)
+        chunks = [chunk for chunk in chunks if len(chunk.strip()) >= 50]
+    except Exception:
+        # Fallback extractive summarization, as a single step
+        yield {
+            "index": 0,
+            "summary": _simple_extractive_summary(document),
+            "cached": False,
+            "fallback": True,
+            "done": 1,
+            "total": 1,
+            "elapsed": time.perf_counter() - started,
+            "eta": 0.0
+        }
+        return
+
+    cache = get_chunk_summary_cache()
+    keys = [_summary_key("chunk", chunk, model_id, max_length, min_length) for chunk in chunks]
+    summaries = []
+    computed = 0
+    compute_seconds = 0.0
+    batch_size = max(1, batch_size)
+    index = 0
+    while index < len(chunks):
+        if cancel is not None and cancel.is_set():
+            return
+        # Serve the cached chunks ahead, then summarize one batch of the rest
+        cached = cache.get_text(keys[index])
+        if cached is not None:
+            batch = [(index, cached, True)]
+        else:
+            pending = [index]
+            while len(pending) < batch_size and pending[-1] + 1 < len(chunks):
+                following = pending[-1] + 1
+                if cache.get_text(keys[following]) is not None:
+                    break
+                pending.append(following)
+            batch_start = time.perf_counter()
+            try:
+                results = _summarize_batched(
+                    summarizer, [chunks[i] for i in pending], max_length, min_length, batch_size
+                )
+            except Exception:
+                # Finish with the extractive summary, as summarize_text would
+                yield {
+                    "index": index,
+                    "summary": _simple_extractive_summary(document),
+                    "cached": False,
+                    "fallback": True,
+                    "done": len(chunks),
+                    "total": len(chunks),
+                    "elapsed": time.perf_counter() - started,
+                    "eta": 0.0
+                }
+                return
+            compute_seconds += time.perf_counter() - batch_start
+            computed += len(pending)
+            for i, summary in zip(pending, results):
+                cache.put_text(keys[i], summary)
+            batch = [(i, summary, False) for i, summary in zip(pending, results)]
+
+        for i, summary, from_cache in batch:
+            summaries.append(summary)
+            remaining = len(chunks) - len(summaries)
+            yield {
+                "index": i,
+                "summary": summary,
+                "cached": from_cache,
+                "fallback": False,
+                "done": len(summaries),
+                "total": len(chunks),
+                "elapsed": time.perf_counter() - started,
+                "eta": remaining * compute_seconds / computed if computed else 0.0
+            }
+        index = batch[-1][0] + 1
+
+    key = _summary_key(
+        "document", document.content_hash, model_id, max_length, min_length, keep_ratio, keep_tokens
+    )
+    get_summary_cache().put_text(key, " ".join(summaries).strip())
+
+def summarize_pages(
+    pages: Iterable[Tuple[int, str]],
+    max_length: int = 150,
+    min_length: int = 50,
+    model_id: Optional[str] = None
+) -> Iterator[Tuple[int, str]]:
+    """
+    Summarizes (page_number, text) pairs as they arrive, e.g. from
+    core.fetcher.iter_pdf_pages, yielding (page_number, summary) per page.
+    The model is loaded once for the whole stream.
+    """
+    model_id = model_id or model_registry.default_model("summarization")
+    try:
+        summarizer = _load_summarizer(model_id)
+    except Exception:
+        summarizer = None
+
+    for page_number, text in pages:
+        if not text or not text.strip():
+            continue
+        summary = ""
+        if summarizer is not None:
+            try:
+                summaries = _summarize_chunks(summarizer, Document(text), max_length, min_length, model_id=model_id)
+                summary = " ".join(summaries).strip()
+            except Exception:
+                summary = ""
+        if not summary:
+            summary = _simple_extractive_summary(Document(text))
+        yield page_number, summary
+
+def summarize_hierarchical(
+    text: Union[str, Document],
+    target_tokens: int = 400,
+    fan_in: int = DEFAULT_FAN_IN,
+    max_workers: Optional[int] = DEFAULT_HIERARCHY_WORKERS,
+    max_length: int = 150,
+    min_length: int = 50,
+    model_id: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    stats: Optional[Dict] = None,
+    use_cache: bool = True,
+    keep_ratio: Optional[float] = None,
+    keep_tokens: Optional[int] = None
+) -> str:
+    """
+    Map-reduce summarization for book-length documents: summarize every chunk
+    across `max_workers` processes, then summarize groups of `fan_in` partial
+    summaries until they fit in `target_tokens`. Other arguments are as in
+    summarize_text; `stats` receives per-level timings.
     """
-    if not text or not text.strip():
+    if not text:
+        return ""
+    document = as_document(text)
+    if not document.text.strip():
         return ""
 
+    model_id = model_id or model_registry.default_model("summarization")
+    fan_in = max(2, fan_in)
+    key = _summary_key(
+        "hierarchical", document.content_hash, model_id, max_length, min_length,
+        target_tokens, fan_in, keep_ratio, keep_tokens
+    )
+    if use_cache:
+        cached = get_summary_cache().get_text(key)
+        if stats is not None:
+            stats["cache_hit"] = cached is not None
+        if cached is not None:
+            return cached
+    levels = []
+    started = time.perf_counter()
+    workers = max_workers or 1
     try:
-        from transformers import pipeline
-        summarizer = pipeline("summarization", model="facebook/bart-large-cnn")
-
-        # Chunk text if too long
-        max_chunk = 1000
-        chunks = [text[i : i + max_chunk] for i in range(0, len(text), max_chunk)]
-        summaries = []
-        for chunk in chunks:
-            if len(chunk.strip()) < 50:
-                continue
-            res = summarizer(
-                chunk,
-                max_length=max_length,
-                min_length=min_length,
-                do_sample=False
-            )
-            summaries.append(res[0]["summary_text"])
-        return " ".join(summaries).strip()
+        try:
+            tokenizer = model_registry.get("tokenizer", model_id)
+            model_available = True
+        except Exception:
+            # Most likely transformers is missing, so workers could not load the model either
+            tokenizer = None
+            model_available = False
+        pooled = workers > 1 and model_available and model_id not in _failed_pool_models
+        reduced = _prereduce(document, keep_ratio, keep_tokens, stats)
+        chunks = [c for c in chunk_document(reduced, tokenizer=tokenizer, stable=use_cache) if len(c.strip()) >= 50]
+
+        # With workers, every stage runs in the pool, so the parent never loads the model
+        with _summary_pool(model_id, workers) if pooled else nullcontext() as pool:
+            stage = (pool, workers, model_id, max_length, min_length, batch_size, levels, use_cache)
+            partials = _run_stage(chunks, "map", *stage)
+            count_tokens = _token_count_fn(tokenizer)
+            while len(partials) > 1 and count_tokens(" ".join(partials)) > target_tokens:
+                groups = [" ".join(partials[i : i + fan_in]) for i in range(0, len(partials), fan_in)]
+                partials = _run_stage(groups, "reduce", *stage)
+        summary = " ".join(partials).strip()
+        if use_cache:
+            get_summary_cache().put_text(key, summary)
     except Exception:
         # Fallback extractive summarization
-        return _simple_extractive_summary(text)
+        summary = _simple_extractive_summary(document)
+
+    if stats is not None:
+        stats["levels"] = levels
+        stats["seconds"] = time.perf_counter() - started
+    return summary
+
+def _prereduce(
+    document: Document,
+    keep_ratio: Optional[float],
+    keep_tokens: Optional[int],
+    stats: Optional[Dict] = None
+) -> Document:
+    """Cut document down to its most salient sentences, if asked to and NumPy/SciPy are available."""
+    if keep_ratio is None and keep_tokens is None:
+        return document
+    try:
+        from .textrank import reduce_document
+    except ImportError:
+        return document
+    reduction = {}
+    start = time.perf_counter()
+    reduced = reduce_document(document, keep_ratio=keep_ratio, max_tokens=keep_tokens, stats=reduction)
+    reduction["seconds"] = time.perf_counter() - start
+    if stats is not None:
+        stats["reduction"] = reduction
+    return reduced
+
+def _token_count_fn(tokenizer):
+    """Count tokens with the tokenizer if there is one, else estimate."""
+    if tokenizer is None:
+        return approx_token_count
+    return lambda text: len(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+def _run_stage(texts: List[str], stage: str, pool, workers: int, model_id: str, max_length: int,
+               min_length: int, batch_size: int, levels: List[Dict], use_cache: bool = True) -> List[str]:
+    """Summarize one level of texts, in the pool if there is one, recording its timing."""
+    start = time.perf_counter()
+
+    def summarize(pending: List[str]) -> List[str]:
+        if pool is None:
+            return _summarize_batched(_load_summarizer(model_id), pending, max_length, min_length, batch_size)
+        # Contiguous slices, a couple per worker; map() keeps them in order
+        slice_size = max(1, -(-len(pending) // (workers * 2)))
+        jobs = [
+            (pending[i : i + slice_size], model_id, max_length, min_length, batch_size)
+            for i in range(0, len(pending), slice_size)
+        ]
+        return [summary for part in pool.map(_summarize_in_worker, jobs) for summary in part]
 
-def _simple_extractive_summary(text: str) -> str:
+    if use_cache:
+        summaries, cached = _cached_summaries(texts, model_id, max_length, min_length, summarize)
+    else:
+        summaries, cached = summarize(texts), 0
+    levels.append({
+        "level": len(levels),
+        "stage": stage,
+        "inputs": len(texts),
+        "outputs": len(summaries),
+        "cached": cached,
+        "seconds": time.perf_counter() - start
+    })
+    return summaries
+
+def _cached_summaries(
+    texts: List[str],
+    model_id: str,
+    max_length: int,
+    min_length: int,
+    summarize: Callable[[List[str]], List[str]]
+) -> Tuple[List[str], int]:
+    """
+    Return one summary per text from the chunk cache, calling `summarize`
+    once on the distinct texts that are not cached yet. Also returns how
+    many texts were served from the cache.
+    """
+    cache = get_chunk_summary_cache()
+    keys = [_summary_key("chunk", text, model_id, max_length, min_length) for text in texts]
+    found = {}
+    pending = {}
+    for key, text in zip(keys, texts):
+        if key in found or key in pending:
+            continue
+        summary = cache.get_text(key)
+        if summary is None:
+            pending[key] = text
+        else:
+            found[key] = summary
+
+    if pending:
+        for key, summary in zip(pending, summarize(list(pending.values()))):
+            cache.put_text(key, summary)
+            found[key] = summary
+    cached = sum(1 for key in keys if key not in pending)
+    return [found[key] for key in keys], cached
+
+class _SummaryPool:
+    """A worker pool for one model, with the sessions using it and when it was last used."""
+    def __init__(self, model_id: str, workers: int):
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context(),
+            initializer=_init_summary_worker,
+            initargs=(model_id, workers)
+        )
+        self.users = 0
+        self.last_used = time.monotonic()
+
+@contextmanager
+def _summary_pool(model_id: str, workers: int):
     """
-    Simple heuristic: splits into sentences, scores by position & length,
-    and returns the top-scoring sentences.
+    Borrow the long-lived worker pool for a model, creating it on first use.
+    Pools idle for longer than the registry's idle_ttl are shut down; a model
+    whose pool breaks is summarized in-process from then on.
     """
-    sentences = re.split(r'(?<=[.!?]) +', text)
-    good = [s for s in sentences if len(s) > 30]
+    key = (model_id, workers)
+    with _summary_pools_lock:
+        _shutdown_idle_pools(exclude=key)
+        pool = _summary_pools.get(key)
+        if pool is None:
+            pool = _summary_pools[key] = _SummaryPool(model_id, workers)
+        pool.users += 1
+    try:
+        yield pool.executor
+    except BrokenProcessPool:
+        with _summary_pools_lock:
+            if _summary_pools.get(key) is pool:
+                del _summary_pools[key]
+            _failed_pool_models.add(model_id)
+        pool.executor.shutdown(wait=False, cancel_futures=True)
+        raise
+    finally:
+        with _summary_pools_lock:
+            pool.users -= 1
+            pool.last_used = time.monotonic()
+
+def _shutdown_idle_pools(exclude: Optional[Tuple[str, int]] = None):
+    """Shut down unused pools idle for longer than idle_ttl; call with _summary_pools_lock held."""
+    ttl = model_registry.idle_ttl
+    if ttl is None or ttl <= 0:
+        return
+    now = time.monotonic()
+    for key, pool in list(_summary_pools.items()):
+        if key != exclude and pool.users == 0 and now - pool.last_used > ttl:
+            del _summary_pools[key]
+            pool.executor.shutdown(wait=False)
+
+def shutdown_summary_pools():
+    """Stop every hierarchical summarization worker pool, freeing their models."""
+    with _summary_pools_lock:
+        pools = list(_summary_pools.values())
+        _summary_pools.clear()
+        _failed_pool_models.clear()
+    for pool in pools:
+        pool.executor.shutdown(wait=True, cancel_futures=True)
+
+def _init_summary_worker(model_id: str, workers: int):
+    """Split the CPU between workers and load this worker's model up front."""
+    try:
+        import torch
+        torch.set_num_threads(max(1, (os.cpu_count() or 1) // workers))
+    except ImportError:
+        pass
+    model_registry.warmup("summarization", model_id)
+
+def _summarize_in_worker(job: Tuple) -> List[str]:
+    """Summarize a slice of texts with this worker's model."""
+    texts, model_id, max_length, min_length, batch_size = job
+    return _summarize_batched(_load_summarizer(model_id), texts, max_length, min_length, batch_size)
+
+def warmup_summarizer(model_id: Optional[str] = None) -> bool:
+    """Load the summarization model ahead of the first request. Returns success."""
+    try:
+        _load_summarizer(model_id)
+        return True
+    except Exception as e:
+        print(f"Error loading summarization model: {str(e)}")
+        return False
+
+def _load_summarizer(model_id: Optional[str] = None):
+    """Return the shared summarization pipeline, loading it on first use."""
+    return model_registry.get("summarization", model_id)
+
+def _summarize_chunks(
+    summarizer,
+    document: Document,
+    max_length: int,
+    min_length: int,
+    batch_size: int = 1,
+    stats: Optional[Dict] = None,
+    model_id: Optional[str] = None
+) -> List[str]:
+    """
+    Summarize a document in sentence-aligned chunks sized to the model's
+    input budget, returning one summary per chunk. When `model_id` is given,
+    chunk summaries are reused from and saved to the chunk cache.
+    """
+    chunk_stats = {}
+    chunks = chunk_document(
+        document, tokenizer=getattr(summarizer, "tokenizer", None), stats=chunk_stats,
+        stable=model_id is not None
+    )
+    chunks = [chunk for chunk in chunks if len(chunk.strip()) >= 50]
+
+    def summarize(pending: List[str]) -> List[str]:
+        return _summarize_batched(summarizer, pending, max_length, min_length, batch_size, stats)
+
+    if model_id is None:
+        summaries, cached = summarize(chunks), 0
+    else:
+        summaries, cached = _cached_summaries(chunks, model_id, max_length, min_length, summarize)
+    if stats is not None:
+        stats["chunking"] = chunk_stats
+        stats["cached_chunks"] = cached
+    return summaries
+
+def _summarize_batched(
+    summarizer,
+    chunks: List[str],
+    max_length: int,
+    min_length: int,
+    batch_size: int = 1,
+    stats: Optional[Dict] = None
+) -> List[str]:
+    """
+    Summarize chunks in batches of similar length, one forward pass per batch,
+    and return the summaries in the original chunk order.
+    """
+    batch_size = max(1, batch_size)
+    # Sorting by length keeps each batch's padding to a minimum
+    order = sorted(range(len(chunks)), key=lambda i: len(chunks[i]))
+    summaries = [None] * len(chunks)
+    batches = 0
+    start = time.perf_counter()
+    for b in range(0, len(order), batch_size):
+        indexes = order[b : b + batch_size]
+        batch = [chunks[i] for i in indexes]
+        results = summarizer(
+            batch if len(batch) > 1 else batch[0],
+            max_length=max_length,
+            min_length=min_length,
+            do_sample=False,
+            truncation=True,
+            batch_size=len(batch)
+        )
+        if len(batch) == 1:
+            results = [results]
+        for i, res in zip(indexes, results):
+            # Pipelines return a list of candidates per input
+            summaries[i] = (res[0] if isinstance(res, list) else res)["summary_text"]
+        batches += 1
+
+    if stats is not None:
+        elapsed = time.perf_counter() - start
+        stats.update({
+            "chunks": len(chunks),
+            "batches": batches,
+            "batch_size": batch_size,
+            "seconds": elapsed,
+            "chunks_per_second": len(chunks) / elapsed if elapsed > 0 else 0.0
+        })
+    return summaries
+
+def _simple_extractive_summary(text: Union[str, Document], num_sentences: int = 5) -> str:
+    """
+    Extractive fallback: the top TextRank sentences in document order, or
+    the position & length heuristic when NumPy/SciPy are unavailable.
+    """
+    document = as_document(text)
+    good = document.sentences(min_length=31)
     if not good:
-        return text[: min(150, len(text))].strip()
+        return document.text[: min(150, len(document.text))].strip()
+
+    try:
+        from .textrank import top_sentence_indexes
+    except ImportError:
+        return _position_summary(good, num_sentences)
+    return " ".join(good[i] for i in top_sentence_indexes(good, num_sentences)).strip()
 
+def _position_summary(sentences: List[str], num_sentences: int = 5) -> str:
+    """Scores sentences by position & length and returns the top-scoring ones."""
     scored = []
-    total = len(good)
-    for idx, sent in enumerate(good):
+    total = len(sentences)
+    for idx, sent in enumerate(sentences):
         pos_score = 1 - (idx / total) * 0.5
         len_score = min(len(sent) / 100, 1)
         scored.append((sent, pos_score * len_score))
 
-    top = sorted(scored, key=lambda x: x[1], reverse=True)[:5]
+    top = sorted(scored, key=lambda x: x[1], reverse=True)[:num_sentences]
     return " ".join(s for s, _ in top).strip()
@@ -0,0 +1,135 @@
+from typing import Dict, List, Optional, Sequence, Union
+import numpy as np
+from scipy import sparse
+from .chunker import approx_token_count
+from .document import Document, as_document
+from .terms import content_words
+
+def term_matrix(sentences: Sequence[str]) -> sparse.csr_matrix:
+    """
+    Build the sentence-by-term TF-IDF matrix, one L2-normalized row per
+    sentence, using sublinear term frequency and smoothed IDF.
+    """
+    vocabulary = {}
+    indices = []
+    indptr = [0]
+    for sentence in sentences:
+        indices.extend(vocabulary.setdefault(word, len(vocabulary)) for word in content_words(sentence))
+        indptr.append(len(indices))
+
+    counts = sparse.csr_matrix(
+        (np.ones(len(indices), dtype=np.float64), np.asarray(indices, dtype=np.int64), indptr),
+        shape=(len(sentences), len(vocabulary))
+    )
+    counts.sum_duplicates()
+    counts.data = 1.0 + np.log(counts.data)
+
+    document_frequency = np.bincount(counts.indices, minlength=len(vocabulary))
+    idf = np.log((1.0 + len(sentences)) / (1.0 + document_frequency)) + 1.0
+    weighted = counts.multiply(idf).tocsr()
+
+    norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sparse.diags(1.0 / norms).dot(weighted).tocsr()
+
+def textrank_scores(
+    sentences: Sequence[str],
+    damping: float = 0.85,
+    max_iter: int = 100,
+    tol: float = 1e-6
+) -> np.ndarray:
+    """
+    Score sentences with TextRank over their TF-IDF cosine similarities.
+
+    The similarity graph W = X Xᵀ (without self-loops) is never built: each
+    power-iteration step multiplies by X and Xᵀ instead, so time and memory
+    grow with the number of term occurrences rather than with the square of
+    the sentence count. Scores sum to 1.
+    """
+    n = len(sentences)
+    if n == 0:
+        return np.zeros(0)
+    matrix = term_matrix(sentences)
+    transposed = matrix.T.tocsr()
+
+    # Rows are unit length (or empty), so each self-similarity is 1 or 0
+    self_similarity = np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel()
+    degree = matrix.dot(transposed.dot(np.ones(n))) - self_similarity
+    dangling = degree <= 1e-12
+    degree[dangling] = 1.0
+
+    scores = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        share = np.where(dangling, 0.0, scores / degree)
+        spread = matrix.dot(transposed.dot(share)) - self_similarity * share
+        # Sentences sharing no terms with others hand their score out evenly
+        updated = (1.0 - damping) / n + damping * (spread + scores[dangling].sum() / n)
+        converged = np.abs(updated - scores).sum() < tol
+        scores = updated
+        if converged:
+            break
+    return scores
+
+def top_sentence_indexes(sentences: Sequence[str], num_sentences: int = 5) -> List[int]:
+    """Return the indexes of the highest-ranked sentences, in document order."""
+    scores = textrank_scores(sentences)
+    # Stable sort so that ties go to the earlier sentence
+    best = np.argsort(-scores, kind="stable")[:num_sentences]
+    return sorted(best.tolist())
+
+def textrank_summary(text: Union[str, Document], num_sentences: int = 5, min_length: int = 31) -> str:
+    """Extractive summary: the top TextRank sentences of text, in document order."""
+    sentences = as_document(text).sentences(min_length=min_length)
+    return " ".join(sentences[i] for i in top_sentence_indexes(sentences, num_sentences)).strip()
+
+def reduce_document(
+    text: Union[str, Document],
+    keep_ratio: Optional[float] = None,
+    max_tokens: Optional[int] = None,
+    stats: Optional[Dict] = None
+) -> Document:
+    """
+    Keep only the most salient sentences of text, as ranked by TextRank.
+
+    Sentences are taken best first until they reach `keep_ratio` of the
+    document's estimated tokens or `max_tokens` tokens, whichever is
+    smaller, then put back in document order with paragraph breaks intact.
+    At least one sentence is always kept. Returns the document unchanged
+    when the budget covers all of it.
+    """
+    document = as_document(text)
+    n = document.num_sentences
+    tokens = np.fromiter((approx_token_count(s) for s in document.sentences()), dtype=np.int64, count=n)
+    total = int(tokens.sum())
+    budget = total
+    if keep_ratio is not None:
+        budget = min(budget, int(total * keep_ratio))
+    if max_tokens is not None:
+        budget = min(budget, max_tokens)
+
+    if budget >= total:
+        kept = document
+    else:
+        order = np.argsort(-textrank_scores(document.sentences()), kind="stable")
+        within = np.cumsum(tokens[order]) <= budget
+        within[0] = True
+        keep = np.sort(order[within])
+
+        paragraphs = []
+        current = None
+        for index in keep.tolist():
+            paragraph = document.paragraph_of(index)
+            if paragraph != current:
+                paragraphs.append([])
+                current = paragraph
+            paragraphs[-1].append(document.sentence(index))
+        kept = Document("\n\n".join(" ".join(p) for p in paragraphs))
+
+    if stats is not None:
+        stats.update({
+            "sentences": n,
+            "sentences_kept": kept.num_sentences,
+            "tokens": total,
+            "tokens_kept": total if kept is document else int(tokens[keep].sum())
+        })
+    return kept
@@ -1,32 +1,479 @@
 import io
-from typing import Optional
+import itertools
+import os
+import tempfile
+import threading
+import time
+import wave
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+from services.cache import CacheService, content_key
+from .document import as_document
 
-def text_to_speech(text: str, language: str = "en", slow: bool = False) -> Optional[bytes]:
-    """Convert text to speech and return audio bytes."""
-    
-    if not text or text.strip() == "":
-        return None
-    
-    try:
+# Longest text sent to the backend in one request; chunks end at sentence boundaries
+TTS_CHUNK_CHARS = int(os.environ.get("EDU_HELPER_TTS_CHUNK_CHARS", 400))
+
+# Concurrent synthesis requests per text_to_speech call
+DEFAULT_TTS_WORKERS = int(os.environ.get("EDU_HELPER_TTS_WORKERS", 4))
+
+# Extra attempts per chunk after a failure, and the first wait between them
+TTS_RETRIES = 2
+TTS_RETRY_BACKOFF = 0.5
+
+# Disk budget for cached audio chunks, in megabytes
+AUDIO_CACHE_MB = int(os.environ.get("EDU_HELPER_AUDIO_CACHE_MB", 256))
+
+_audio_cache = None
+
+# Backend used when callers don't pass one: "gtts" (online), "offline"
+# (a local pyttsx3/espeak engine) or "fake" (silent audio, for tests)
+DEFAULT_TTS_BACKEND = os.environ.get("EDU_HELPER_TTS_BACKEND", "gtts")
+
+# Shown when a backend can't report its languages
+_FALLBACK_LANGUAGES = {"en": "English"}
+
+class TTSBackend:
+    """
+    A speech synthesizer. Subclasses implement synthesize() and languages();
+    join() glues the audio of consecutive chunks back together.
+    """
+    name = "base"
+    audio_format = "mp3"
+
+    def synthesize(self, text: str, language: str = "en", slow: bool = False) -> bytes:
+        raise NotImplementedError
+
+    def languages(self) -> Dict[str, str]:
+        """Language codes this backend speaks, mapped to display names."""
+        return dict(_FALLBACK_LANGUAGES)
+
+    def join(self, segments: List[bytes]) -> bytes:
+        """MP3 frames can simply be concatenated."""
+        return b"".join(segments)
+
+class WavBackend(TTSBackend):
+    """Base for backends producing WAV, which needs its header rewritten to join."""
+    audio_format = "wav"
+
+    def join(self, segments: List[bytes]) -> bytes:
+        buffer = io.BytesIO()
+        write_wav_segments(segments, buffer)
+        return buffer.getvalue()
+
+class GTTSBackend(TTSBackend):
+    """Google Translate's TTS service through gTTS; needs network access."""
+    name = "gtts"
+
+    def synthesize(self, text: str, language: str = "en", slow: bool = False) -> bytes:
         from gtts import gTTS
-        
+
         # Create gTTS object
         tts = gTTS(text=text, lang=language, slow=slow)
-        
+
         # Save to BytesIO object
         audio_buffer = io.BytesIO()
         tts.write_to_fp(audio_buffer)
-        audio_buffer.seek(0)
-        
-        return audio_buffer.read()
-        
+        return audio_buffer.getvalue()
+
+    def languages(self) -> Dict[str, str]:
+        from gtts.lang import tts_langs
+        return tts_langs()
+
+class EnginePool:
+    """
+    Fixed-size pool of warm engine instances, created on first need and
+    reused, so requests don't pay engine startup. Each engine is used by one
+    thread at a time; an engine that fails is dropped and its slot freed for
+    a replacement.
+    """
+    def __init__(self, factory: Callable[[], object], size: int = 1):
+        self.factory = factory
+        self.size = max(1, size)
+        self._idle = []
+        self._created = 0
+        self._available = threading.Condition()
+
+    @contextmanager
+    def engine(self):
+        """Borrow an engine, waiting for one to free up if all are busy."""
+        engine = self._acquire()
+        try:
+            yield engine
+        except Exception:
+            # An engine that failed mid-utterance may be in a bad state
+            self._discard()
+            raise
+        else:
+            self._release(engine)
+
+    def warmup(self):
+        """Create every engine now rather than on first use."""
+        engines = []
+        try:
+            for _ in range(self.size):
+                engines.append(self._acquire())
+        finally:
+            for engine in engines:
+                self._release(engine)
+
+    def _acquire(self):
+        with self._available:
+            while not self._idle and self._created >= self.size:
+                self._available.wait()
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            return self.factory()
+        except BaseException:
+            # Wake a waiter so it can try creating the engine itself
+            self._discard()
+            raise
+
+    def _release(self, engine):
+        with self._available:
+            self._idle.append(engine)
+            self._available.notify()
+
+    def _discard(self):
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+
+class OfflineBackend(WavBackend):
+    """
+    Local synthesis with pyttsx3 (espeak on Linux, SAPI5 on Windows), for
+    deployments without network access. The engine is kept warm in an
+    EnginePool between requests.
+    """
+    name = "offline"
+
+    # pyttsx3's espeak driver shares one process-wide espeak instance and
+    # callback between engines, so only one utterance runs at a time across
+    # every OfflineBackend
+    _engine_lock = threading.Lock()
+
+    def __init__(self, engine_factory: Optional[Callable[[], object]] = None):
+        self.pool = EnginePool(engine_factory or self._create_engine, size=1)
+        self._voices = None
+        self._languages = None
+
+    @staticmethod
+    def _create_engine():
+        import pyttsx3
+        # pyttsx3.init() would hand back a cached engine shared with other callers
+        return pyttsx3.Engine()
+
+    @contextmanager
+    def _engine(self):
+        with self._engine_lock, self.pool.engine() as engine:
+            yield engine
+
+    def synthesize(self, text: str, language: str = "en", slow: bool = False) -> bytes:
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            with self._engine() as engine:
+                voice = self._voice_for(engine, language)
+                if voice is not None:
+                    engine.setProperty("voice", voice)
+                engine.setProperty("rate", 120 if slow else 175)
+                engine.save_to_file(text, path)
+                engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def languages(self) -> Dict[str, str]:
+        # Once read, voices are served without waiting for the engine
+        if self._languages is None:
+            with self._engine() as engine:
+                self._load_voices(engine)
+        return dict(self._languages)
+
+    def _voice_for(self, engine, language: str) -> Optional[str]:
+        voices = self._load_voices(engine)
+        match = voices.get(language) or voices.get(language.split("-")[0])
+        return match[0] if match else None
+
+    def _load_voices(self, engine) -> Dict[str, tuple]:
+        """
+        Map language codes, full and primary ("fr-fr" and "fr"), to (voice id,
+        voice name), read once from the engine. Only full codes are listed.
+        """
+        if self._voices is None:
+            voices = {}
+            languages = {}
+            for voice in engine.getProperty("voices"):
+                for language in getattr(voice, "languages", None) or []:
+                    if isinstance(language, bytes):
+                        # espeak reports a priority byte before the code
+                        language = language[1:].decode("ascii", "ignore")
+                    code = language.lower().replace("_", "-")
+                    languages.setdefault(code, voice.name)
+                    voices.setdefault(code, (voice.id, voice.name))
+                    voices.setdefault(code.split("-")[0], (voice.id, voice.name))
+            self._languages = languages
+            self._voices = voices
+        return self._voices
+
+class FakeBackend(WavBackend):
+    """In-process stand-in: silent WAV audio, 10 ms per character, no dependencies."""
+    name = "fake"
+
+    def synthesize(self, text: str, language: str = "en", slow: bool = False) -> bytes:
+        rate = 8000
+        frames = len(text) * rate // (50 if slow else 100)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(1)
+            wav.setframerate(rate)
+            wav.writeframes(b"\x80" * frames)
+        return buffer.getvalue()
+
+    def languages(self) -> Dict[str, str]:
+        return {"en": "English", "fr": "French", "de": "German"}
+
+BACKENDS: Dict[str, Callable[[], TTSBackend]] = {
+    "gtts": GTTSBackend,
+    "offline": OfflineBackend,
+    "fake": FakeBackend,
+}
+
+_backends: Dict[str, TTSBackend] = {}
+_backends_lock = threading.Lock()
+_backend: Optional[TTSBackend] = None
+
+def set_backend(backend: Union[TTSBackend, str]):
+    """Replace the backend used when callers don't pass one, e.g. with a stand-in for tests."""
+    global _backend
+    _backend = get_backend(backend) if isinstance(backend, str) else backend
+
+def get_backend(name: Optional[str] = None) -> TTSBackend:
+    """Return the shared instance of a backend by name, or the default backend."""
+    if name is None:
+        if _backend is not None:
+            return _backend
+        name = DEFAULT_TTS_BACKEND
+    with _backends_lock:
+        backend = _backends.get(name)
+        if backend is None:
+            backend = _backends[name] = BACKENDS[name]()
+        return backend
+
+def get_supported_languages(backend: Union[TTSBackend, str, None] = None) -> Dict[str, str]:
+    """
+    Language codes and display names the backend can speak, for the
+    sidebar. English comes first, so it is the default choice.
+    """
+    if not isinstance(backend, TTSBackend):
+        backend = get_backend(backend)
+    try:
+        languages = backend.languages() or dict(_FALLBACK_LANGUAGES)
+    except Exception as e:
+        print(f"Error listing {backend.name} languages: {str(e)}")
+        return dict(_FALLBACK_LANGUAGES)
+    # Plain "en", then other English variants, then the rest in backend order
+    order = sorted(languages, key=lambda code: (code != "en", code.split("-")[0] != "en"))
+    return {code: languages[code] for code in order}
+
+def write_wav_segments(segments: Iterable[bytes], f) -> bool:
+    """
+    Write WAV segments as one WAV file to a seekable file object, one segment
+    in memory at a time. Returns whether anything was written.
+    """
+    writer = None
+    try:
+        for segment in segments:
+            with wave.open(io.BytesIO(segment), "rb") as part:
+                if writer is None:
+                    writer = wave.open(f, "wb")
+                    writer.setparams(part.getparams())
+                writer.writeframes(part.readframes(part.getnframes()))
+    finally:
+        if writer is not None:
+            # Patches the header with the final length
+            writer.close()
+    return writer is not None
+
+def get_audio_cache() -> CacheService:
+    """
+    Return the shared cache of synthesized chunks, stored uncompressed
+    (audio doesn't compress) under data/cache/audio.
+    """
+    global _audio_cache
+    if _audio_cache is None:
+        _audio_cache = CacheService(
+            cache_dir="data/cache/audio",
+            max_entries=256,
+            compress=False,
+            max_bytes=32 * 1024 * 1024,
+            max_disk_bytes=AUDIO_CACHE_MB * 1024 * 1024
+        )
+    return _audio_cache
+
+def split_for_speech(text: str, max_chars: int = TTS_CHUNK_CHARS) -> List[str]:
+    """
+    Pack whole sentences into chunks of at most `max_chars` characters. A
+    sentence longer than that is split between words.
+    """
+    chunks = []
+    current = ""
+    for sentence in as_document(text).sentences():
+        pieces = [sentence] if len(sentence) <= max_chars else _split_words(sentence, max_chars)
+        for piece in pieces:
+            if current and len(current) + 1 + len(piece) > max_chars:
+                chunks.append(current)
+                current = piece
+            else:
+                current = f"{current} {piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+def _split_words(sentence: str, max_chars: int) -> List[str]:
+    pieces = []
+    current = ""
+    for word in sentence.split():
+        if current and len(current) + 1 + len(word) > max_chars:
+            pieces.append(current)
+            current = word
+        else:
+            current = f"{current} {word}" if current else word
+    if current:
+        pieces.append(current)
+    return pieces
+
+def text_to_speech(
+    text: str,
+    language: str = "en",
+    slow: bool = False,
+    backend: Union[TTSBackend, str, None] = None,
+    max_workers: int = DEFAULT_TTS_WORKERS,
+    use_cache: bool = True
+) -> Optional[bytes]:
+    """
+    Convert text to speech and return audio bytes.
+
+    The text is split at sentence boundaries into chunks of at most
+    TTS_CHUNK_CHARS characters, which are synthesized concurrently on up to
+    `max_workers` threads, each retried on failure, and joined in order.
+    Chunks are cached by text, language, speed and backend, so after an edit
+    only the changed chunks are synthesized again.
+    """
+
+    if not text or text.strip() == "":
+        return None
+
+    if not isinstance(backend, TTSBackend):
+        backend = get_backend(backend)
+    try:
+        segments = list(_iter_segments(text, language, slow, backend, max_workers, use_cache))
+        return backend.join(segments)
+
     except ImportError:
-        print("gTTS library not found. Please install it to use text-to-speech.")
+        print(f"Library for the {backend.name} TTS backend not found. Please install it to use text-to-speech.")
         return None
     except Exception as e:
         print(f"Error generating audio: {str(e)}")
         return None
 
+def text_to_speech_stream(
+    text: str,
+    language: str = "en",
+    slow: bool = False,
+    backend: Union[TTSBackend, str, None] = None,
+    max_workers: int = DEFAULT_TTS_WORKERS,
+    use_cache: bool = True
+) -> Iterator[bytes]:
+    """
+    Like text_to_speech, but yields each chunk's audio in order as soon as
+    it and all chunks before it are ready, so playback can start early.
+    Closing the generator cancels chunks not yet started. On an error the
+    stream ends early after printing it.
+    """
+    if not text or text.strip() == "":
+        return
+
+    if not isinstance(backend, TTSBackend):
+        backend = get_backend(backend)
+    try:
+        yield from _iter_segments(text, language, slow, backend, max_workers, use_cache)
+    except ImportError:
+        print(f"Library for the {backend.name} TTS backend not found. Please install it to use text-to-speech.")
+    except Exception as e:
+        print(f"Error generating audio: {str(e)}")
+
+def _iter_segments(
+    text: str,
+    language: str,
+    slow: bool,
+    backend: TTSBackend,
+    max_workers: int,
+    use_cache: bool
+) -> Iterator[bytes]:
+    """Synthesize the chunks of text concurrently and yield their audio in order."""
+    chunks = split_for_speech(text)
+    cache = get_audio_cache() if use_cache else None
+    synthesize = lambda chunk: _synthesize_chunk(backend, chunk, language, slow, cache)
+    if len(chunks) == 1 or max_workers <= 1:
+        for chunk in chunks:
+            yield synthesize(chunk)
+        return
+
+    workers = min(max_workers, len(chunks))
+    pool = ThreadPoolExecutor(max_workers=workers)
+    pending = deque()
+    try:
+        # Keep a bounded window of chunks in flight, ahead of the one being yielded
+        remaining = iter(chunks)
+        for chunk in itertools.islice(remaining, workers * 2):
+            pending.append(pool.submit(synthesize, chunk))
+        while pending:
+            segment = pending.popleft().result()
+            chunk = next(remaining, None)
+            if chunk is not None:
+                pending.append(pool.submit(synthesize, chunk))
+            yield segment
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+def _synthesize_chunk(
+    backend: TTSBackend,
+    text: str,
+    language: str,
+    slow: bool,
+    cache: Optional[CacheService] = None
+) -> bytes:
+    """Return one chunk's audio from the cache, or synthesize and cache it."""
+    if cache is None:
+        return _synthesize_with_retry(backend, text, language, slow)
+    key = content_key(text, language, str(slow), backend.name)
+    audio = cache.get(key)
+    if audio is None:
+        audio = _synthesize_with_retry(backend, text, language, slow)
+        cache.put(key, audio)
+    return audio
+
+def _synthesize_with_retry(backend: TTSBackend, text: str, language: str, slow: bool) -> bytes:
+    """Synthesize one chunk, retrying transient failures with exponential backoff."""
+    for attempt in range(TTS_RETRIES + 1):
+        try:
+            return backend.synthesize(text, language, slow)
+        except ImportError:
+            raise
+        except Exception:
+            if attempt == TTS_RETRIES:
+                raise
+            time.sleep(TTS_RETRY_BACKOFF * 2 ** attempt)
+
 def save_audio_to_file(audio_bytes: bytes, filename: str = "audio.mp3") -> bool:
     """Save audio bytes to file."""
     try:
@@ -36,3 +483,33 @@ def save_audio_to_file(audio_bytes: bytes, filename: str = "audio.mp3") -> bool:
     except Exception as e:
         print(f"Error saving audio file: {str(e)}")
         return False
+
+def save_audio_stream(segments: Iterable[bytes], filename: str = "audio.mp3", audio_format: str = "mp3") -> bool:
+    """
+    Write audio segments to file as they arrive, e.g. from
+    text_to_speech_stream, holding only one segment in memory. Pass the
+    backend's audio_format so WAV segments are merged under one header. The
+    file appears under its name only once complete.
+    """
+    tmp_path = f"{filename}.{os.getpid()}.part"
+    written = False
+    try:
+        with open(tmp_path, 'wb') as f:
+            if audio_format == "wav":
+                written = write_wav_segments(segments, f)
+            else:
+                for segment in segments:
+                    f.write(segment)
+                    written = True
+        if not written:
+            os.remove(tmp_path)
+            return False
+        os.replace(tmp_path, filename)
+        return True
+    except Exception as e:
+        print(f"Error saving audio file: {str(e)}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
@@ -0,0 +1,214 @@
+import hashlib
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional
+
+def content_key(*parts) -> str:
+    """Build a cache key as the SHA-256 of the given parts (bytes-like or str)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        digest.update(hashlib.sha256(part).digest())
+    return digest.hexdigest()
+
+class CacheService:
+    """
+    Two-tier content-addressed cache: a bounded in-memory LRU in front of a
+    compressed on-disk store. Values are bytes; keys are hex digests.
+    The memory tier holds at most `max_entries` values and, if set,
+    `max_bytes` bytes in total. If `max_disk_bytes` is set, the least
+    recently used files are deleted once the disk tier grows past it.
+    """
+    def __init__(
+        self,
+        cache_dir: str = "data/cache",
+        max_entries: int = 32,
+        compress: bool = True,
+        max_bytes: Optional[int] = None,
+        max_disk_bytes: Optional[int] = None
+    ):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.compress = compress
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk_bytes = None
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "disk_evictions": 0
+        }
+        self._ensure_cache_dir()
+
+    def _ensure_cache_dir(self):
+        """Ensure cache directory exists."""
+        if not os.path.exists(self.cache_dir):
+            os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached value for key, or None on a miss."""
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self._stats["memory_hits"] += 1
+                return value
+
+        value = self._read_disk(key)
+        with self._lock:
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._remember(key, value)
+        return value
+
+    def put(self, key: str, value: bytes):
+        """Store value under key in both tiers."""
+        with self._lock:
+            self._remember(key, value)
+        self._write_disk(key, value)
+
+    def get_text(self, key: str) -> Optional[str]:
+        """Return a cached UTF-8 string, or None on a miss."""
+        value = self.get(key)
+        return value.decode("utf-8") if value is not None else None
+
+    def put_text(self, key: str, text: str):
+        """Store a string as UTF-8."""
+        self.put(key, text.encode("utf-8"))
+
+    def stats(self) -> Dict[str, float]:
+        """Return hit/miss counters and the overall hit rate."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            stats["memory_bytes"] = self._memory_bytes
+            if self._disk_bytes is not None:
+                stats["disk_bytes"] = self._disk_bytes
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
+
+    def clear(self, disk: bool = False):
+        """Drop the in-memory tier, and the on-disk tier too if requested."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+        if disk:
+            for root, _, files in os.walk(self.cache_dir):
+                for filename in files:
+                    try:
+                        os.remove(os.path.join(root, filename))
+                    except OSError:
+                        pass
+
+    def _remember(self, key: str, value: bytes):
+        """Insert into the memory tier and evict least recently used entries. Lock held."""
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = value
+        self._memory_bytes += len(value)
+        while self._memory and (
+            len(self._memory) > self.max_entries
+            or (self.max_bytes is not None and self._memory_bytes > self.max_bytes)
+        ):
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self._stats["evictions"] += 1
+
+    def _path(self, key: str) -> str:
+        """On-disk location for key, fanned out by prefix."""
+        return os.path.join(self.cache_dir, key[:2], key + (".z" if self.compress else ".bin"))
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        """Read a value from the disk tier, or None if absent or unreadable."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            if self.max_disk_bytes is not None:
+                # The modification time doubles as the last-used time for eviction
+                os.utime(path)
+            return zlib.decompress(data) if self.compress else data
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Error reading cache entry: {str(e)}")
+            return None
+
+    def _write_disk(self, key: str, value: bytes):
+        """Atomically write a value to the disk tier."""
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(zlib.compress(value, 6) if self.compress else value)
+            if self.max_disk_bytes is not None:
+                self._account_disk(path, os.path.getsize(tmp_path))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"Error writing cache entry: {str(e)}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            return
+        if self.max_disk_bytes is not None and self._disk_bytes > self.max_disk_bytes:
+            self._evict_disk()
+
+    def _cache_files(self):
+        """(last used, size, path) for every entry in the disk tier."""
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith((".z", ".bin")):
+                    path = os.path.join(root, name)
+                    try:
+                        info = os.stat(path)
+                    except OSError:
+                        continue
+                    files.append((info.st_mtime, info.st_size, path))
+        return files
+
+    def _account_disk(self, path: str, size: int):
+        """Add a new file's size to the disk total, less the file it replaces."""
+        with self._disk_lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = sum(size for _, size, _ in self._cache_files())
+            try:
+                self._disk_bytes -= os.path.getsize(path)
+            except OSError:
+                pass
+            self._disk_bytes += size
+
+    def _evict_disk(self):
+        """Delete least recently used files until the disk tier is 10% under its cap."""
+        with self._disk_lock:
+            # Rescan, since other processes may share the directory
+            files = sorted(self._cache_files())
+            total = sum(size for _, size, _ in files)
+            target = self.max_disk_bytes * 0.9
+            for _, size, path in files:
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                with self._lock:
+                    self._stats["disk_evictions"] += 1
+            self._disk_bytes = total
@@ -1,5 +1,6 @@
-import re
-from typing import List, Dict
+from typing import Iterable, List, Dict, Optional, Tuple, Union
+from core.chunker import chunk_document
+from core.document import Document, as_document
 
 class SemanticSearchService:
     def __init__(self):
@@ -7,16 +8,42 @@ class SemanticSearchService:
         self.text_chunks = []
         self.embeddings = None
     
-    def setup_index(self, text: str):
-        """Setup search index from text."""
+    def setup_index(self, text: Union[str, Document], max_tokens: Optional[int] = None, overlap_sentences: int = 1):
+        """
+        Setup search index from text or a segmented Document.
+        Indexes single sentences by default; with `max_tokens` it indexes
+        sentence-packed passages of up to that many tokens instead.
+        """
         if not text:
             self.text_chunks = []
             return
         
-        # Split text into sentences for better search granularity
-        sentences = re.split(r'[.!?]+', text)
-        self.text_chunks = [s.strip() + '.' for s in sentences if len(s.strip()) > 20]
+        document = as_document(text)
+        if max_tokens:
+            self.text_chunks = chunk_document(document, max_tokens=max_tokens, overlap_sentences=overlap_sentences)
+        else:
+            # Index sentences for better search granularity
+            self.text_chunks = self._split_sentences(document)
+        self._build_index()
+    
+    def setup_index_from_pages(self, pages: Iterable[Tuple[int, str]]):
+        """Setup search index from (page_number, text) pairs as they arrive."""
+        self.index = None
+        self.embeddings = None
+        self.text_chunks = []
+        for _, text in pages:
+            if text:
+                self.text_chunks.extend(self._split_sentences(Document(text)))
         
+        if self.text_chunks:
+            self._build_index()
+    
+    def _split_sentences(self, document: Document) -> List[str]:
+        """Return the document's searchable sentence chunks."""
+        return document.sentences(min_length=21)
+    
+    def _build_index(self):
+        """Build the semantic index over text_chunks, or fall back to keywords."""
         try:
             # Try to use sentence transformers if available
             self._setup_semantic_index()
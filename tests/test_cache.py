@@ -0,0 +1,45 @@
+import pytest
+from services.cache import CacheService, content_key
+
+def test_lru_evicts_oldest(tmp_path):
+    cache = CacheService(cache_dir=str(tmp_path), max_entries=2)
+    for name in ("a", "b", "c"):
+        cache.put(content_key(name), name.encode())
+    stats = cache.stats()
+    assert stats["memory_entries"] == 2
+    assert stats["evictions"] == 1
+
+def test_disk_tier_survives_new_instance(tmp_path):
+    key = content_key(b"lecture.pdf", "v1")
+    CacheService(cache_dir=str(tmp_path)).put_text(key, "extracted text")
+    cache = CacheService(cache_dir=str(tmp_path))
+    assert cache.get_text(key) == "extracted text"
+    assert cache.get_text(key) == "extracted text"
+    assert cache.get(content_key("missing")) is None
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["memory_hits"], stats["misses"]) == (1, 1, 1)
+
+def test_memory_tier_respects_byte_budget(tmp_path):
+    cache = CacheService(cache_dir=str(tmp_path), max_entries=100, max_bytes=250)
+    for i in range(5):
+        cache.put(content_key(str(i)), b"x" * 100)
+    stats = cache.stats()
+    assert stats["memory_entries"] == 2 and stats["memory_bytes"] == 200
+    # Evicted entries are still served from disk
+    assert cache.get(content_key("0")) == b"x" * 100
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+    import os
+    cache = CacheService(cache_dir=str(tmp_path), max_entries=1, compress=False, max_disk_bytes=1000)
+    keys = [content_key(str(i)) for i in range(12)]
+    for i, key in enumerate(keys):
+        cache.put(key, b"x" * 100)
+        # Distinct, increasing last-used times
+        os.utime(cache._path(key), (i, i))
+        if i == 8:
+            cache.get(keys[0])
+    stats = cache.stats()
+    assert stats["disk_evictions"] > 0 and stats["disk_bytes"] <= 1000
+    assert cache.get(keys[-1]) == b"x" * 100
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == b"x" * 100
@@ -0,0 +1,35 @@
+import pytest
+from core.chunker import chunk_document
+
+class WordTokenizer:
+    """One token per word, mimicking the transformers tokenizer call signature."""
+    model_max_length = 12
+
+    def __call__(self, texts, add_special_tokens=True):
+        return {"input_ids": [text.split() for text in texts]}
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+TEXT = ("One two three four. Five six seven. Eight nine ten eleven twelve. "
+        "Thirteen fourteen. Fifteen sixteen seventeen eighteen.")
+
+def test_chunks_pack_whole_sentences_to_budget():
+    stats = {}
+    chunks = chunk_document(TEXT, tokenizer=WordTokenizer(), stats=stats)
+    assert chunks == [
+        "One two three four. Five six seven.",
+        "Eight nine ten eleven twelve. Thirteen fourteen.",
+        "Fifteen sixteen seventeen eighteen.",
+    ]
+    assert stats["max_tokens"] == 10
+    assert stats["chunks"] == 3 and stats["tokens"] == 18
+
+def test_overlap_and_long_sentence_split():
+    chunks = chunk_document(TEXT, max_tokens=7, tokenizer=WordTokenizer(), overlap_sentences=1)
+    # The overlap is dropped when it would not leave room for the next sentence
+    assert chunks[1] == "Eight nine ten eleven twelve. Thirteen fourteen."
+    assert chunks[2] == "Thirteen fourteen. Fifteen sixteen seventeen eighteen."
+    long_chunks = chunk_document("a b c d e f g h i j.", max_tokens=4, tokenizer=WordTokenizer())
+    assert all(len(chunk.split()) <= 4 for chunk in long_chunks)
+    assert " ".join(long_chunks) == "a b c d e f g h i j."
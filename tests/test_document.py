@@ -0,0 +1,37 @@
+import pytest
+from core.document import Document, get_document
+
+TEXT = """Photosynthesis converts light energy into chemical energy. It happens in chloroplasts!
+Is the Calvin cycle part of it? Yes, at 3.5 times the rate.
+
+Cellular respiration releases the stored energy.   It occurs in mitochondria.
+"""
+
+def test_segments_sentences_and_paragraphs():
+    doc = Document(TEXT)
+    assert doc.num_paragraphs == 2
+    assert doc.sentences() == [
+        "Photosynthesis converts light energy into chemical energy.",
+        "It happens in chloroplasts!",
+        "Is the Calvin cycle part of it?",
+        "Yes, at 3.5 times the rate.",
+        "Cellular respiration releases the stored energy.",
+        "It occurs in mitochondria.",
+    ]
+    assert [doc.paragraph_of(i) for i in range(len(doc))] == [0, 0, 0, 0, 1, 1]
+    start, end = doc.sentence_span(4)
+    assert TEXT[start:end] == doc.sentence(4)
+
+def test_get_document_is_cached_by_content():
+    assert get_document(TEXT) is get_document("".join(TEXT))
+    assert get_document(TEXT) is not get_document(TEXT + " More.")
+
+def test_consumers_share_boundaries():
+    from core.quizgen import generate_flashcards
+    from services.embeddings import SemanticSearchService
+    doc = get_document(TEXT)
+    service = SemanticSearchService()
+    service.setup_index(doc)
+    assert service.text_chunks == doc.sentences(min_length=21)
+    cloze = generate_flashcards(doc, num_cards=1)[0]
+    assert cloze["front"].replace("_____", cloze["back"]) == doc.sentence(0).rstrip(".")
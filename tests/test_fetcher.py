@@ -0,0 +1,93 @@
+import io
+import pytest
+from core.fetcher import iter_pdf_pages
+
+def _make_pdf(path, lines):
+    from reportlab.pdfgen import canvas
+    c = canvas.Canvas(str(path))
+    for line in lines:
+        c.drawString(100, 750, line)
+        c.showPage()
+    c.save()
+    return io.BytesIO(path.read_bytes())
+
+def test_iter_pdf_pages_in_order(tmp_path):
+    buf = _make_pdf(tmp_path / "p.pdf", [f"Page {n} body" for n in range(1, 8)])
+    pages = list(iter_pdf_pages(buf, buffer_size=2))
+    assert [n for n, _ in pages] == list(range(1, 8))
+    assert "Page 5 body" in pages[4][1]
+
+def test_iter_pdf_pages_early_close(tmp_path):
+    buf = _make_pdf(tmp_path / "p.pdf", [f"Page {n}" for n in range(1, 20)])
+    pages = iter_pdf_pages(buf, buffer_size=1)
+    assert next(pages)[0] == 1
+    pages.close()
+
+def test_parallel_extraction_matches_serial(tmp_path):
+    import multiprocessing
+    from core.fetcher import iter_pdf_pages_parallel
+    buf = _make_pdf(tmp_path / "p.pdf", [f"Page {n} body" for n in range(1, 12)])
+    serial = list(iter_pdf_pages(io.BytesIO(buf.getvalue()), buffer_size=0))
+    start_method = multiprocessing.get_start_method(allow_none=True)
+    parallel = list(iter_pdf_pages_parallel(buf, max_workers=2, min_pages=1))
+    assert parallel == serial
+    # Extraction must not pin the process-wide start method
+    assert multiprocessing.get_start_method(allow_none=True) == start_method
+
+def test_concurrent_parallel_extractions_keep_their_documents(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    from core.fetcher import iter_pdf_pages_parallel
+    bufs = [
+        _make_pdf(tmp_path / f"{name}.pdf", [f"{name} page {n}" for n in range(1, 10)])
+        for name in ("First", "Second", "Third")
+    ]
+    extract = lambda buf: list(iter_pdf_pages_parallel(buf, max_workers=2, min_pages=1))
+    with ThreadPoolExecutor(max_workers=3) as threads:
+        results = list(threads.map(extract, bufs))
+    for name, pages in zip(("First", "Second", "Third"), results):
+        assert [n for n, _ in pages] == list(range(1, 10))
+        assert all(text.startswith(name) for _, text in pages)
+
+def test_extract_text_cached_reuses_result(tmp_path):
+    from core.fetcher import extract_text_cached
+    from services.cache import CacheService
+    cache = CacheService(cache_dir=str(tmp_path / "cache"))
+    buf = _make_pdf(tmp_path / "p.pdf", ["Cached page"])
+    first = extract_text_cached(buf, cache=cache)
+    second = extract_text_cached(io.BytesIO(buf.getvalue()), cache=cache)
+    assert first == second and "Cached page" in first
+    assert cache.stats()["memory_hits"] == 1
+
+def test_extract_text_cached_keys_on_encoding(tmp_path):
+    from core.fetcher import extract_text_cached
+    from services.cache import CacheService
+    cache = CacheService(cache_dir=str(tmp_path / "cache"))
+    data = "Grüße".encode("utf-8")
+    assert extract_text_cached(data, "txt", cache=cache) == "Grüße"
+    assert extract_text_cached(data, "txt", cache=cache, encoding="latin-1") == data.decode("latin-1")
+    assert extract_text_cached(data, "txt", cache=cache, encoding=None) == "Grüße"
+
+def test_extract_from_memoryview_and_spilled_stream(tmp_path):
+    from core.fetcher import as_buffer, extract_text_from_pdf
+    buf = _make_pdf(tmp_path / "p.pdf", ["Zero copy page"])
+    view = as_buffer(buf)
+    assert view.nbytes == len(buf.getvalue())
+    assert "Zero copy page" in extract_text_from_pdf(view)
+    with open(tmp_path / "p.pdf", "rb") as f:
+        spilled = as_buffer(f)
+        assert "Zero copy page" in extract_text_from_pdf(spilled)
+
+def test_txt_chunks_split_multibyte_characters():
+    from core.fetcher import iter_txt_chunks, extract_text_from_txt
+    text = "Café résumé naïve — 日本語のテキスト.\n" * 500
+    data = text.encode("utf-8")
+    chunks = list(iter_txt_chunks(io.BytesIO(data), block_size=7))
+    assert [n for n, _ in chunks] == list(range(1, len(chunks) + 1))
+    assert "".join(c for _, c in chunks) == text
+    assert extract_text_from_txt(data) == text
+
+def test_txt_encoding_detection():
+    from core.fetcher import detect_encoding, extract_text_from_txt
+    assert detect_encoding("plain ascii".encode("utf-8")) == "utf-8"
+    assert extract_text_from_txt("Grüße".encode("utf-16")) == "Grüße"
+    assert extract_text_from_txt("Grüße aus Köln".encode("cp1252")) == "Grüße aus Köln"
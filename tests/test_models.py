@@ -0,0 +1,34 @@
+import threading
+import pytest
+from core.models import ModelRegistry
+
+def test_registry_loads_each_model_once():
+    loads = []
+    registry = ModelRegistry()
+    registry.register_loader("summarization", lambda model_id: loads.append(model_id) or object(), "tiny-test-model")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("summarization"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert loads == ["tiny-test-model"]
+    assert all(model is results[0] for model in results)
+
+def test_registry_evicts_idle_models():
+    registry = ModelRegistry(idle_ttl=10)
+    registry.register_loader("summarization", lambda model_id: object(), "tiny-test-model")
+    registry.warmup("summarization")
+    assert registry.evict_idle(now=0) == []
+    assert registry.evict_idle(now=float("inf")) == [("summarization", "tiny-test-model")]
+    assert not registry.is_loaded("summarization")
+
+def test_summary_model_ids_carry_the_backend():
+    from core.models import split_backend, summary_model_id
+    assert summary_model_id("org/model", "torch") == "org/model"
+    assert summary_model_id("org/model", "int8") == "org/model@int8"
+    assert split_backend("org/model@onnx") == ("org/model", "onnx")
+    assert split_backend("org/model") == ("org/model", "torch")
+    assert split_backend("./local@v2") == ("./local@v2", "torch")
+    with pytest.raises(ValueError):
+        summary_model_id("org/model", "fp8")
@@ -0,0 +1,42 @@
+import random
+import re
+import pytest
+from core.parser import StudyMaterialParser
+
+def legacy_clean(text):
+    """The original eight-pass cleaner, kept as the reference behaviour."""
+    if not text:
+        return ""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s.,!?;:\'"()-]', '', text)
+    text = re.sub(r'[.]{3,}', '...', text)
+    text = re.sub(r'[!]{2,}', '!', text)
+    text = re.sub(r'[?]{2,}', '?', text)
+    text = re.sub(r'\s+([,.!?;:])', r'\1', text)
+    text = re.sub(r'([,.!?;:])\s*([,.!?;:])', r'\1 \2', text)
+    return text.strip()
+
+ALPHABET = "ab Z9_é .,!?;:@#*\t\n\r 　'\"()-"
+
+def random_texts(count, seed=7):
+    rng = random.Random(seed)
+    for _ in range(count):
+        yield "".join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 60)))
+
+def test_clean_matches_legacy():
+    parser = StudyMaterialParser()
+    samples = [
+        "Hello   world !!  Is this ... real???  Yes, , it is.",
+        "  Wait.... what?! @#$ Okay ; fine :  done .  ",
+        "Tabs\tand\nnewlines too -- (quoted) \"text\" it's",
+    ]
+    for text in samples + list(random_texts(3000)):
+        assert parser.clean_extracted_text(text) == legacy_clean(text), repr(text)
+
+def test_clean_stream_matches_whole_text():
+    parser = StudyMaterialParser()
+    rng = random.Random(11)
+    for text in random_texts(1000, seed=3):
+        cuts = sorted(rng.sample(range(len(text) + 1), min(len(text) + 1, 4)))
+        chunks = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+        assert "".join(parser.clean_stream(chunks)) == legacy_clean(text), repr(chunks)
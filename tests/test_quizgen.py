@@ -0,0 +1,120 @@
+from core.document import Document
+from core.quizgen import generate_flashcards, generate_quiz, score_sentences
+
+def make_long_document() -> Document:
+    filler = "This introductory paragraph mentions the course schedule in passing."
+    topics = [
+        "Photosynthesis is the process that converts light energy into glucose",
+        "Mitochondrion is the organelle where cellular respiration releases energy",
+        "Osmosis refers to the movement of water across a selectively permeable membrane",
+    ]
+    paragraphs = []
+    for topic in topics:
+        paragraphs.append(" ".join([filler] * 30))
+        paragraphs.append(f"{topic}. {topic.split()[0]} appears again in this later summary sentence.")
+    return Document("\n\n".join(paragraphs))
+
+def test_definitions_outscore_filler():
+    document = make_long_document()
+    scores, definitions = score_sentences(document)
+    best = [document.sentence(i) for i in scores.argsort()[::-1][:3]]
+    assert all(" is " in s or "refers to" in s for s in best)
+    assert definitions.sum() >= 3
+
+def test_cards_cover_the_whole_document():
+    document = make_long_document()
+    cards = generate_flashcards(document, num_cards=3)
+    assert [card["type"] for card in cards] == ["definition"] * 3
+    fronts = " ".join(card["front"] for card in cards)
+    assert "Photosynthesis" in fronts and "Mitochondrion" in fronts and "Osmosis" in fronts
+
+def test_card_count_is_capped_by_material():
+    assert generate_flashcards("Too short.", num_cards=5) == []
+    assert len(generate_flashcards(make_long_document(), num_cards=50)) <= 50
+
+def test_distractors_resemble_the_answer():
+    from core.distractors import VocabularyIndex, term_shape
+    text = ("Respiration and fermentation differ. Circulation, digestion and excretion matter. "
+            "Cells divide while tissues grow, and organs and systems cooperate. Energy flows.")
+    index = VocabularyIndex(text)
+    options = index.distractors("Photosynthesis", 3)
+    assert len(options) == 3 and "Photosynthesis" not in options
+    assert index.distractors("respiration", 1) == ["fermentation"]
+    assert all(term_shape(o) == "lower:plural" for o in index.distractors("membranes", 3))
+
+def test_distractors_use_embeddings_when_given():
+    import numpy as np
+    from core.distractors import VocabularyIndex
+    vectors = {"apple": [1, 0], "pear": [0.9, 0.1], "plum": [0.8, 0.3], "truck": [0, 1]}
+    index = VocabularyIndex("apple pear plum truck", encode=lambda terms: np.array([vectors[t] for t in terms]))
+    assert index.distractors("apple", 2) == ["pear", "plum"]
+
+def test_quiz_options_come_from_the_document():
+    document = make_long_document()
+    for question in generate_quiz(document, num_questions=5):
+        assert question["correct_answer"] in question["options"]
+        assert len(set(question["options"])) == len(question["options"])
+        assert not any(option.startswith("option ") for option in question["options"])
+
+def test_exact_type_counts_and_early_stop():
+    from core.quizgen import generate_cards, take_cards
+    cards = generate_cards(make_long_document(), {"cloze": 4, "definition": 2})
+    assert sorted(card["type"] for card in cards) == ["cloze"] * 4 + ["definition"] * 2
+
+    consumed = []
+    def source():
+        for i in range(100):
+            consumed.append(i)
+            yield i, {"type": "cloze" if i % 3 else "definition"}
+    picked = take_cards(source(), {"cloze": 2, "definition": 1})
+    assert len(picked) == 3 and consumed == [0, 1, 2]
+
+def test_quiz_returns_requested_question_count():
+    assert len(generate_quiz(make_long_document(), num_questions=6)) == 6
+
+def test_batch_decks_are_deterministic_across_worker_counts():
+    import multiprocessing
+    from core.quizgen import generate_flashcards_batch
+    base = make_long_document().text
+    texts = [base + f"\n\nReview note {i} covers every topic of this chapter again." for i in range(4)] + [""]
+    serial = dict(generate_flashcards_batch(texts, num_cards=4, seed=7, max_workers=1))
+    start_method = multiprocessing.get_start_method(allow_none=True)
+    parallel = dict(generate_flashcards_batch(texts, num_cards=4, seed=7, max_workers=2))
+    assert serial == parallel and sorted(serial) == list(range(5))
+    # Batching must not pin the process-wide start method
+    assert multiprocessing.get_start_method(allow_none=True) == start_method
+    assert serial[4] == [] and all(len(serial[i]) == 4 for i in range(4))
+
+def test_scheduler_follows_sm2_intervals():
+    from core.quizgen import ReviewScheduler
+    scheduler = ReviewScheduler(capacity=2)
+    cards = scheduler.add_cards(3, now=0)
+    assert scheduler.next_due(now=0) == 0
+    day = 86400
+    for expected_days in (1, 6, 16):
+        now = int(scheduler.due[0])
+        scheduler.grade(0, 5, now=now)
+        assert scheduler.due[0] - now == expected_days * day
+    scheduler.grade(1, 1, now=0)
+    assert scheduler.repetitions[1] == 0 and scheduler.due[1] == day
+    assert scheduler.ease[1] < 2.5 and scheduler.ease[0] > 2.5
+    assert scheduler.next_due(now=0) == 2
+    assert list(scheduler.due_cards(now=day)) == [2, 1]
+
+def test_scheduler_bulk_grading_matches_single(tmp_path):
+    import numpy as np
+    from core.quizgen import ReviewScheduler
+    single, bulk = ReviewScheduler(), ReviewScheduler()
+    single.add_cards(50, now=0)
+    bulk.add_cards(50, now=0)
+    qualities = np.arange(50) % 6
+    for card, quality in enumerate(qualities):
+        single.grade(card, quality, now=10)
+    bulk.grade_many(np.arange(50), qualities, now=10)
+    assert np.array_equal(single.due[:50], bulk.due[:50])
+    assert bulk.next_due(now=10 + 86400) == single.next_due(now=10 + 86400)
+
+    path = str(tmp_path / "reviews.npz")
+    bulk.save(path)
+    restored = ReviewScheduler.load(path)
+    assert len(restored) == 50 and np.array_equal(restored.ease[:50], bulk.ease[:50])
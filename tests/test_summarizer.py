@@ -1,5 +1,36 @@
 import pytest
+import core.summarizer
+from core.models import _load_summarization_pipeline, _load_tokenizer, model_registry
 from core.summarizer import generate_summary
+from services.cache import CacheService
+
+FAKE_MODEL = "fake-model"
+
+@pytest.fixture(autouse=True)
+def summary_caches(tmp_path, monkeypatch):
+    """Keep summary caches out of data/ and independent between tests."""
+    monkeypatch.setattr(core.summarizer, "_summary_cache", CacheService(str(tmp_path / "summaries")))
+    monkeypatch.setattr(core.summarizer, "_chunk_summary_cache", CacheService(str(tmp_path / "chunks")))
+
+@pytest.fixture
+def install_summarizer():
+    """
+    Return a function that installs a stand-in summarization model (and
+    tokenizer, None by default) for every model id; the real loaders are
+    restored after the test.
+    """
+    def install(summarizer, tokenizer=None):
+        model_registry.register_loader("summarization", lambda model_id: summarizer)
+        model_registry.register_loader("tokenizer", lambda model_id: tokenizer)
+        return summarizer
+
+    yield install
+    # Pool workers were forked with the stand-in loaders
+    core.summarizer.shutdown_summary_pools()
+    model_registry.evict("summarization", FAKE_MODEL)
+    model_registry.evict("tokenizer", FAKE_MODEL)
+    model_registry.register_loader("summarization", _load_summarization_pipeline)
+    model_registry.register_loader("tokenizer", _load_tokenizer)
 
 def test_summary_nonempty():
     text = "This project uses AI to summarize text efficiently."
@@ -9,3 +40,193 @@ def test_summary_nonempty():
 
 def test_summary_empty():
     assert generate_summary("") == ""
+
+class FakeSummarizer:
+    """Stands in for a transformers pipeline; records each forward pass."""
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, inputs, **kwargs):
+        batch = inputs if isinstance(inputs, list) else [inputs]
+        self.calls.append([len(text) for text in batch])
+        results = [[{"summary_text": text[:10]}] for text in batch]
+        return results if isinstance(inputs, list) else results[0]
+
+def test_batched_summaries_keep_chunk_order():
+    from core.summarizer import _summarize_batched
+    chunks = ["x" * n + f" chunk {i}" for i, n in enumerate([300, 60, 200, 90, 120])]
+    fake = FakeSummarizer()
+    stats = {}
+    summaries = _summarize_batched(fake, chunks, 50, 10, batch_size=2, stats=stats)
+    assert summaries == [chunk[:10] for chunk in chunks]
+    assert fake.calls == [[68, 98], [128, 208], [308]]
+    assert stats["chunks"] == 5 and stats["batches"] == 3
+    assert stats["chunks_per_second"] > 0
+
+class FirstWordsSummarizer(FakeSummarizer):
+    """Summarizes every input to its first eight words."""
+    def __call__(self, inputs, **kwargs):
+        batch = inputs if isinstance(inputs, list) else [inputs]
+        results = [[{"summary_text": " ".join(text.split()[:8])}] for text in batch]
+        return results if isinstance(inputs, list) else results[0]
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_hierarchical_reduces_to_target(workers, install_summarizer):
+    import multiprocessing
+    from core.summarizer import summarize_hierarchical
+    install_summarizer(FirstWordsSummarizer())
+    start_method = multiprocessing.get_start_method(allow_none=True)
+    sentence = "Mitochondria release the energy stored in glucose during respiration. "
+    stats = {}
+    summary = summarize_hierarchical(
+        sentence * 400, target_tokens=30, fan_in=3, max_workers=workers,
+        model_id=FAKE_MODEL, stats=stats
+    )
+    stages = [level["stage"] for level in stats["levels"]]
+    assert stages[0] == "map" and stages[1:] and set(stages[1:]) == {"reduce"}
+    levels = stats["levels"]
+    assert all(cur["outputs"] == -(-prev["outputs"] // 3) for prev, cur in zip(levels, levels[1:]))
+    assert summary and len(summary.split()) <= 30
+    # The worker pool must not pin the process-wide start method
+    assert multiprocessing.get_start_method(allow_none=True) == start_method
+
+def test_hierarchical_pool_stays_warm_and_parent_skips_model(install_summarizer, tmp_path):
+    import os
+    from core.summarizer import summarize_hierarchical
+    loads = tmp_path / "loads"
+    install_summarizer(FirstWordsSummarizer())
+
+    def load(model_id):
+        with open(loads, "a") as f:
+            f.write(f"{os.getpid()}\n")
+        return FirstWordsSummarizer()
+
+    model_registry.register_loader("summarization", load)
+    sentence = "Mitochondria release the energy stored in glucose during respiration. "
+    for text in (sentence * 400, sentence.replace("glucose", "fat") * 400, "Short text about cells. " * 5):
+        stats = {}
+        assert summarize_hierarchical(text, target_tokens=30, fan_in=7, max_workers=2,
+                                      model_id=FAKE_MODEL, stats=stats, use_cache=False)
+    # Single-text stages also ran in the pool, whose two workers loaded the model once each
+    assert stats["levels"][0]["inputs"] == 1
+    assert not model_registry.is_loaded("summarization", FAKE_MODEL)
+    pids = loads.read_text().split()
+    assert len(pids) == len(set(pids)) <= 2 and str(os.getpid()) not in pids
+
+def test_hierarchical_skips_pool_when_model_cannot_load(install_summarizer):
+    from core.summarizer import summarize_hierarchical
+
+    def missing(model_id):
+        raise ImportError("transformers")
+
+    install_summarizer(FirstWordsSummarizer())
+    text = "Mitochondria release the energy stored in glucose during respiration. " * 400
+    model_registry.register_loader("tokenizer", missing)
+    model_registry.register_loader("summarization", missing)
+    for _ in range(3):
+        assert summarize_hierarchical(text, max_workers=2, model_id=FAKE_MODEL, use_cache=False)
+        assert core.summarizer._summary_pools == {}
+
+    # The tokenizer loads but the model doesn't: the pool breaks once and is not rebuilt
+    model_registry.register_loader("tokenizer", lambda model_id: None)
+    for _ in range(3):
+        assert summarize_hierarchical(text, max_workers=2, model_id=FAKE_MODEL, use_cache=False)
+    assert core.summarizer._summary_pools == {}
+    assert FAKE_MODEL in core.summarizer._failed_pool_models
+
+def test_cache_resummarizes_only_changed_chunks(install_summarizer):
+    from core.summarizer import summarize_text
+    fake = install_summarizer(FakeSummarizer())
+    sentences = [f"Sentence number {i} describes one step of the water cycle." for i in range(400)]
+    text = " ".join(sentences)
+    first = summarize_text(text, model_id=FAKE_MODEL, batch_size=1)
+    chunks = len(fake.calls)
+    assert chunks > 2
+
+    stats = {}
+    assert summarize_text(text, model_id=FAKE_MODEL, batch_size=1, stats=stats) == first
+    assert stats["cache_hit"] and len(fake.calls) == chunks
+
+    sentences[-1] = sentences[-1].replace("water", "rock")
+    stats = {}
+    summarize_text(" ".join(sentences), model_id=FAKE_MODEL, batch_size=1, stats=stats)
+    assert len(fake.calls) == chunks + 1
+    assert stats["cached_chunks"] == chunks - 1
+
+    summarize_text(text, max_length=80, min_length=30, model_id=FAKE_MODEL, batch_size=1)
+    assert len(fake.calls) == 2 * chunks + 1
+
+def test_edit_near_start_keeps_later_chunks_cached(install_summarizer):
+    from core.summarizer import summarize_text
+    fake = install_summarizer(FakeSummarizer())
+    sentences = [f"Sentence number {i} describes one step of the water cycle." for i in range(2500)]
+    stats = {}
+    summarize_text(" ".join(sentences), model_id=FAKE_MODEL, batch_size=1, stats=stats)
+    chunks = stats["chunking"]["chunks"]
+    assert chunks >= 40
+
+    sentences[0] += " It repeats every single day."
+    stats = {}
+    summarize_text(" ".join(sentences), model_id=FAKE_MODEL, batch_size=1, stats=stats)
+    assert stats["cached_chunks"] >= chunks - 2
+
+    # Without the cache, chunks are packed full again
+    stats = {}
+    summarize_text(" ".join(sentences), model_id=FAKE_MODEL, use_cache=False, stats=stats)
+    assert stats["chunking"]["chunks"] < chunks
+    assert stats["chunking"]["fill_ratio"] > 0.95
+
+def test_prereduction_shrinks_model_input(install_summarizer):
+    from core.summarizer import summarize_text
+    fake = install_summarizer(FakeSummarizer())
+    text = " ".join(f"Sentence {i} explains how glaciers carve deep valleys over time." for i in range(300))
+    summarize_text(text, model_id=FAKE_MODEL, use_cache=False)
+    full = sum(sum(call) for call in fake.calls)
+    fake.calls.clear()
+    stats = {}
+    summarize_text(text, model_id=FAKE_MODEL, use_cache=False, keep_ratio=0.25, stats=stats)
+    reduced = sum(sum(call) for call in fake.calls)
+    assert reduced < full * 0.3
+    assert stats["reduction"]["sentences_kept"] < stats["reduction"]["sentences"]
+
+def test_stream_yields_chunks_in_order_and_cancels(install_summarizer):
+    import threading
+    from core.summarizer import summarize_text, summarize_text_stream
+    fake = install_summarizer(FakeSummarizer())
+    text = " ".join(f"Sentence number {i} describes one step of the water cycle." for i in range(400))
+    updates = list(summarize_text_stream(text, model_id=FAKE_MODEL, batch_size=2))
+    assert [u["index"] for u in updates] == list(range(len(updates)))
+    assert [u["done"] for u in updates] == list(range(1, len(updates) + 1))
+    assert updates[-1]["eta"] == 0 and all(u["total"] == len(updates) for u in updates)
+    calls = len(fake.calls)
+    # The finished stream filled the cache for the blocking call
+    assert summarize_text(text, model_id=FAKE_MODEL) == " ".join(u["summary"] for u in updates)
+    assert len(fake.calls) == calls
+
+    cancel = threading.Event()
+    other = text.replace("water", "carbon")
+    stream = summarize_text_stream(other, model_id=FAKE_MODEL, batch_size=1, cancel=cancel)
+    next(stream)
+    cancel.set()
+    assert list(stream) == []
+    assert len(fake.calls) == calls + 1
+
+def test_stream_falls_back_when_model_fails_midway(install_summarizer):
+    from core.summarizer import _simple_extractive_summary, summarize_text, summarize_text_stream
+
+    class FailingSummarizer(FakeSummarizer):
+        def __call__(self, inputs, **kwargs):
+            if self.calls:
+                raise RuntimeError("out of memory")
+            return super().__call__(inputs, **kwargs)
+
+    install_summarizer(FailingSummarizer())
+    text = " ".join(f"Sentence number {i} describes one step of the water cycle." for i in range(400))
+    updates = list(summarize_text_stream(text, model_id=FAKE_MODEL, batch_size=1))
+    assert not updates[0]["fallback"] and updates[-1]["fallback"]
+    assert updates[-1]["summary"] == _simple_extractive_summary(text)
+    assert updates[-1]["done"] == updates[-1]["total"]
+    # Nothing was cached for the whole document, so the model is tried again
+    stats = {}
+    summarize_text(text, model_id=FAKE_MODEL, stats=stats)
+    assert not stats["cache_hit"]
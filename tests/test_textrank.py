@@ -0,0 +1,42 @@
+import numpy as np
+from core.summarizer import _simple_extractive_summary
+from core.textrank import term_matrix, textrank_scores, top_sentence_indexes
+
+SENTENCES = [
+    "Photosynthesis converts light energy into chemical energy in plants.",
+    "Chlorophyll absorbs light energy for photosynthesis in the leaves.",
+    "The stock market closed higher on Tuesday afternoon.",
+    "Plants store the chemical energy from photosynthesis as glucose.",
+    "Light energy drives photosynthesis inside chloroplasts.",
+]
+
+def test_term_matrix_rows_are_unit_length():
+    matrix = term_matrix(SENTENCES + ["the and of"])
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    assert np.allclose(norms[:-1], 1.0) and norms[-1] == 0
+
+def test_scores_favour_central_sentences():
+    scores = textrank_scores(SENTENCES)
+    assert np.isclose(scores.sum(), 1.0)
+    assert scores.argmin() == 2
+
+def test_top_sentences_in_document_order():
+    indexes = top_sentence_indexes(SENTENCES, 3)
+    assert indexes == sorted(indexes) and 2 not in indexes
+    assert top_sentence_indexes([], 3) == []
+
+def test_extractive_summary_uses_document_order():
+    summary = _simple_extractive_summary(" ".join(SENTENCES))
+    positions = [summary.find(s) for s in SENTENCES if s in summary]
+    assert positions == sorted(positions) and len(positions) == 5
+
+def test_reduce_document_keeps_salient_sentences_in_order():
+    from core.textrank import reduce_document
+    text = " ".join(SENTENCES[:3]) + "\n\n" + " ".join(SENTENCES[3:])
+    stats = {}
+    reduced = reduce_document(text, keep_ratio=0.5, stats=stats)
+    kept = reduced.sentences()
+    assert 0 < len(kept) < len(SENTENCES) and SENTENCES[2] not in kept
+    assert [SENTENCES.index(s) for s in kept] == sorted(SENTENCES.index(s) for s in kept)
+    assert stats["tokens_kept"] <= stats["tokens"] // 2
+    assert reduce_document(text, keep_ratio=1.0).text == text
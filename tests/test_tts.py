@@ -0,0 +1,177 @@
+import random
+import threading
+import time
+import pytest
+import core.tts
+from core.tts import FakeBackend, TTSBackend, split_for_speech, text_to_speech
+from services.cache import CacheService
+
+class FlakyBackend(TTSBackend):
+    """Returns the text as 'audio' after a random delay; fails each chunk's first attempt if asked."""
+    name = "flaky"
+
+    def __init__(self, fail_first: bool = False):
+        self.fail_first = fail_first
+        self.attempts = {}
+        self.lock = threading.Lock()
+
+    def synthesize(self, text, language="en", slow=False):
+        with self.lock:
+            self.attempts[text] = self.attempts.get(text, 0) + 1
+            attempt = self.attempts[text]
+        time.sleep(random.random() * 0.01)
+        if self.fail_first and attempt == 1:
+            raise ConnectionError("transient")
+        return f"[{text}]".encode("utf-8")
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch, tmp_path):
+    monkeypatch.setattr(core.tts, "TTS_RETRY_BACKOFF", 0)
+    # Keep cached audio out of data/ and independent between tests
+    monkeypatch.setattr(core.tts, "_audio_cache", CacheService(str(tmp_path / "audio"), compress=False))
+
+TEXT = " ".join(f"Sentence {i} is read aloud by the speech engine." for i in range(40))
+
+def test_chunks_respect_cap_and_sentences():
+    chunks = split_for_speech(TEXT, max_chars=120)
+    assert all(len(chunk) <= 120 for chunk in chunks)
+    assert " ".join(chunks) == TEXT
+    assert all(chunk.endswith(".") for chunk in chunks)
+    assert max(len(c) for c in split_for_speech("word " * 100, max_chars=30)) <= 30
+
+def test_parallel_synthesis_keeps_order_and_retries():
+    backend = FlakyBackend(fail_first=True)
+    audio = text_to_speech(TEXT, backend=backend, max_workers=4)
+    chunks = split_for_speech(TEXT)
+    assert audio == b"".join(f"[{chunk}]".encode("utf-8") for chunk in chunks)
+    assert all(count == 2 for count in backend.attempts.values())
+
+def test_persistent_failure_returns_none():
+    class BrokenBackend(TTSBackend):
+        def synthesize(self, text, language="en", slow=False):
+            raise ConnectionError("offline")
+    assert text_to_speech(TEXT, backend=BrokenBackend()) is None
+    assert text_to_speech("   ") is None
+
+def test_cache_resynthesizes_only_changed_chunks():
+    backend = FlakyBackend()
+    first = text_to_speech(TEXT, backend=backend)
+    calls = sum(backend.attempts.values())
+    assert text_to_speech(TEXT, backend=backend) == first
+    assert sum(backend.attempts.values()) == calls
+
+    edited = TEXT.replace("Sentence 39 ", "Sentence thirty-nine ")
+    text_to_speech(edited, backend=backend)
+    assert sum(backend.attempts.values()) == calls + 1
+    text_to_speech(TEXT, backend=backend, slow=True)
+    assert sum(backend.attempts.values()) == 2 * calls + 1
+
+def test_stream_yields_ordered_segments_and_writes_file(tmp_path):
+    from core.tts import save_audio_stream, text_to_speech_stream
+    backend = FlakyBackend()
+    segments = list(text_to_speech_stream(TEXT, backend=backend, max_workers=3, use_cache=False))
+    assert segments == [f"[{chunk}]".encode("utf-8") for chunk in split_for_speech(TEXT)]
+
+    path = tmp_path / "notes.mp3"
+    assert save_audio_stream(text_to_speech_stream(TEXT, backend=backend, use_cache=False), str(path))
+    assert path.read_bytes() == b"".join(segments)
+    assert not save_audio_stream(iter([]), str(tmp_path / "empty.mp3"))
+
+def test_closing_stream_stops_synthesis():
+    from core.tts import split_for_speech, text_to_speech_stream
+    backend = FlakyBackend()
+    stream = text_to_speech_stream(TEXT * 5, backend=backend, max_workers=2, use_cache=False)
+    next(stream)
+    stream.close()
+    time.sleep(0.05)
+    assert sum(backend.attempts.values()) < len(split_for_speech(TEXT * 5))
+
+def test_fake_backend_joins_wav_segments(tmp_path):
+    import io
+    import wave
+    from core.tts import save_audio_stream, text_to_speech_stream
+    backend = FakeBackend()
+    audio = text_to_speech(TEXT, backend=backend, use_cache=False)
+    with wave.open(io.BytesIO(audio)) as wav:
+        assert wav.getnframes() == sum(len(chunk) * 80 for chunk in split_for_speech(TEXT))
+
+    path = tmp_path / "notes.wav"
+    segments = text_to_speech_stream(TEXT, backend="fake", use_cache=False)
+    assert save_audio_stream(segments, str(path), audio_format="wav")
+    assert path.read_bytes() == audio
+
+class FakeEngine:
+    """Mimics the parts of a pyttsx3 engine the offline backend uses."""
+    created = 0
+
+    def __init__(self):
+        FakeEngine.created += 1
+        self.properties = {"voices": [type("Voice", (), {"id": "v-fr", "name": "French", "languages": [b"\x05fr-fr"]})]}
+        self.pending = None
+
+    def getProperty(self, name):
+        return self.properties[name]
+
+    def setProperty(self, name, value):
+        self.properties[name] = value
+
+    def save_to_file(self, text, path):
+        self.pending = (text, path)
+
+    def runAndWait(self):
+        text, path = self.pending
+        with open(path, "wb") as f:
+            f.write(FakeBackend().synthesize(text))
+
+def test_offline_backend_reuses_warm_engine():
+    from core.tts import OfflineBackend, get_supported_languages
+    FakeEngine.created = 0
+    backend = OfflineBackend(engine_factory=FakeEngine)
+    audio = text_to_speech(TEXT, language="fr", backend=backend, max_workers=4, use_cache=False)
+    fake = FakeBackend()
+    assert audio == fake.join([fake.synthesize(chunk) for chunk in split_for_speech(TEXT)])
+    assert FakeEngine.created == 1
+    assert get_supported_languages(backend) == {"fr-fr": "French"}
+    # Cached voices are listed without waiting for a synthesis in progress
+    with OfflineBackend._engine_lock:
+        assert get_supported_languages(backend) == {"fr-fr": "French"}
+    assert get_supported_languages("fake")["en"] == "English"
+
+def test_supported_languages_list_english_first():
+    from core.tts import get_supported_languages
+
+    class AlphabeticalBackend(TTSBackend):
+        name = "alphabetical"
+
+        def languages(self):
+            return {"af": "Afrikaans", "de": "German", "en": "English", "en-gb": "English (UK)", "fr": "French"}
+
+    assert list(get_supported_languages(AlphabeticalBackend())) == ["en", "en-gb", "af", "de", "fr"]
+
+def test_engine_pool_waiters_see_factory_failure():
+    from core.tts import EnginePool, OfflineBackend
+
+    def missing_engine():
+        time.sleep(0.01)
+        raise ImportError("pyttsx3")
+
+    pool = EnginePool(missing_engine, size=2)
+    errors = []
+
+    def borrow():
+        try:
+            with pool.engine():
+                pass
+        except ImportError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=borrow, daemon=True) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert not any(thread.is_alive() for thread in threads)
+    assert len(errors) == 6
+
+    backend = OfflineBackend(engine_factory=missing_engine)
+    assert text_to_speech(TEXT, backend=backend, max_workers=4, use_cache=False) is None
@@ -1,5 +1,6 @@
 import streamlit as st
 from typing import Dict, Any, Tuple, Optional
+from core.fetcher import as_buffer
 from core.tts import get_supported_languages
 
 def render_file_upload_sidebar() -> Tuple[Optional[Any], Optional[Dict[str, Any]]]:
@@ -7,7 +8,9 @@ def render_file_upload_sidebar() -> Tuple[Optional[Any], Optional[Dict[str, Any]
     Render the file upload section in the sidebar with modern styling.
     
     Returns:
-        Tuple of (uploaded_file, file_stats)
+        Tuple of (uploaded_file, file_stats). file_stats['buffer'] is a
+        zero-copy memoryview of the upload that the core.fetcher functions
+        accept directly.
     """
     st.markdown("""
     <style>
@@ -51,8 +54,9 @@ def render_file_upload_sidebar() -> Tuple[Optional[Any], Optional[Dict[str, Any]
     
     file_stats = None
     if uploaded_file:
-        # Calculate file stats
-        file_size = len(uploaded_file.getvalue())
+        # Calculate file stats from the upload's own buffer; getvalue() would copy it
+        file_buffer = as_buffer(uploaded_file)
+        file_size = file_buffer.nbytes
         if file_size < 1024:
             size_str = f"{file_size} bytes"
         elif file_size < 1024 * 1024:
@@ -64,7 +68,8 @@ def render_file_upload_sidebar() -> Tuple[Optional[Any], Optional[Dict[str, Any]
             'name': uploaded_file.name,
             'size': file_size,
             'size_str': size_str,
-            'type': uploaded_file.type
+            'type': uploaded_file.type,
+            'buffer': file_buffer
         }
         
         # Display file stats with modern styling
@@ -133,7 +138,14 @@ def render_settings_sidebar() -> Dict[str, Any]:
         key="summary_length",
         label_visibility="collapsed"
     )
-    settings['summary'] = {'length': summary_length}
+    summary_reduction = st.select_slider(
+        "Pre-reduction",
+        options=["off", "light", "medium", "aggressive"],
+        value="off",
+        key="summary_reduction",
+        help="Keep only the most important sentences before summarizing; faster on long texts"
+    )
+    settings['summary'] = {'length': summary_length, 'reduction': summary_reduction}
     st.markdown('</div>', unsafe_allow_html=True)
     
     # Flashcard Settings
@@ -1,4 +1,6 @@
 import streamlit as st
+from typing import Dict, Iterator
+from core.tts import TTSBackend
 
 def render_about_contact():
     st.markdown('''<a name="about"></a>''', unsafe_allow_html=True)
@@ -20,3 +22,55 @@ def render_about_contact():
         • GitHub: [shivang731](https://github.com/shivang731)  
         """)
     st.markdown("---")
+
+def render_summary_stream(stream: Iterator[Dict]) -> str:
+    """
+    Render a summary as summarize_text_stream produces it, with a progress
+    bar, and return the full text. The stream is closed on the way out, so
+    a rerun that interrupts rendering also stops summarizing.
+    """
+    progress = st.progress(0.0, text="Summarizing...")
+    output = st.empty()
+    parts = []
+    try:
+        for update in stream:
+            if update["fallback"]:
+                # The model failed; show the extractive summary instead
+                parts = []
+            parts.append(update["summary"])
+            output.markdown(" ".join(parts))
+            progress.progress(
+                update["done"] / update["total"],
+                text=f"Summarized {update['done']}/{update['total']} sections "
+                     f"· about {update['eta']:.0f}s left"
+            )
+    finally:
+        stream.close()
+    progress.empty()
+    return " ".join(parts).strip()
+
+def render_audio_stream(segments: Iterator[bytes], backend: TTSBackend) -> bytes:
+    """
+    Play audio as text_to_speech_stream produces it with `backend`: the
+    first segment is playable as soon as it arrives, then the player
+    switches to the full recording, joined by the backend, once every
+    segment is in. Returns the full audio.
+    """
+    audio_format = f"audio/{backend.audio_format}"
+    status = st.empty()
+    player = st.empty()
+    parts = []
+    status.caption("Generating audio...")
+    try:
+        for segment in segments:
+            parts.append(segment)
+            if len(parts) == 1:
+                player.audio(segment, format=audio_format)
+                status.caption("Playing the first part while the rest is generated...")
+    finally:
+        segments.close()
+    status.empty()
+    audio = backend.join(parts) if parts else b""
+    if len(parts) > 1:
+        player.audio(audio, format=audio_format)
+    return audio